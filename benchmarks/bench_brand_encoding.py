@@ -0,0 +1,60 @@
+"""
+Holdout RMSE and training time of the price models with Brand one-hot
+encoded (cat.ONE_HOT_MAX_SIZE, needed for the NumPy export) versus
+CatBoost's default CTR encoding. Brands follow preproc.clean_data: the two
+main vendors plus "Unknown", each with its own price premium. Every row
+averages --seeds synthetic catalogs split by cat.holdout_mask.
+
+    python benchmarks/bench_brand_encoding.py [--rows 3000 20000] [--seeds 5]
+"""
+import argparse
+import time
+import numpy as np
+
+from synthetic import BRANDS, make_catalog
+import cat
+from preproc import preprocess_for_catboost
+
+# Brand share and price multiplier; missing brands become "Unknown" in preprocessing
+SHARES = [0.47, 0.47, 0.06]
+PREMIUMS = [1.15, 0.95, 0.8]
+
+
+def branded_catalog(n, label, seed):
+    df = make_catalog(n, label, seed)
+    rng = np.random.default_rng(seed + 1000)
+    pick = rng.choice(3, n, p=SHARES)
+    df["Brand"] = np.array(BRANDS[label] + [None], dtype=object)[pick]
+    df["Price"] = np.round(df["Price"] * np.asarray(PREMIUMS)[pick], 2)
+    df["ValueScore"] = np.round(df["PassMark_Score"] / df["Price"], 2)
+    return df
+
+
+def evaluate(df, label, one_hot_max_size):
+    X, y, cat_features = preprocess_for_catboost(df)
+    holdout = cat.holdout_mask(df[label])
+    start = time.perf_counter()
+    model = cat.fit_model(X[~holdout], y[~holdout], cat_features, cat.DEFAULT_PARAMS, thread_count=1,
+                          one_hot_max_size=one_hot_max_size)
+    return cat.holdout_rmse(model, X[holdout], y[holdout]), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[3000, 20000])
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    encodings = {"CTR (default)": None, f"one-hot (<= {cat.ONE_HOT_MAX_SIZE})": cat.ONE_HOT_MAX_SIZE}
+    print(f"{'':<14}{'encoding':<18}{'RMSE ($) mean':>14}{'min':>9}{'max':>9}{'train':>9}")
+    for label in ("CPU", "GPU"):
+        for n in args.rows:
+            catalogs = [branded_catalog(n, label, seed) for seed in range(args.seeds)]
+            for name, size in encodings.items():
+                rmse, seconds = zip(*(evaluate(df, label, size) for df in catalogs))
+                print(f"{label} {n:>8,}  {name:<18}{np.mean(rmse):>14.2f}{min(rmse):>9.2f}{max(rmse):>9.2f}"
+                      f"{np.mean(seconds):>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Best CPU+GPU builds under a budget: src/builds.py's frontier sweep versus
+brute force over every pair. The brute force scores all n*m pairs in CPU
+chunks so it fits in memory; a pandas cross join, the naive approach, is
+timed only up to --cross-join-max parts per side. All methods must return
+the same top-k objective values.
+
+    python benchmarks/bench_builds.py [--parts 1000 10000] [--budgets 400 1000 2500] [--k 10]
+"""
+import argparse
+import time
+import numpy as np
+
+from synthetic import make_catalog, percentiles
+from builds import BuildOptimizer
+
+
+def brute_force(cpu, gpu, budget, k, chunk=256):
+    """
+    Top-k (value, total price) over all pairs with raw scores, chunked over CPUs.
+    """
+    cp, cs = cpu["Price"].to_numpy(float), cpu["PassMark_Score"].to_numpy(float)
+    gp, gs = gpu["Price"].to_numpy(float), gpu["PassMark_Score"].to_numpy(float)
+    best = np.empty(0)
+    for start in range(0, len(cp), chunk):
+        value = cs[start:start + chunk, None] + gs[None, :]
+        value[cp[start:start + chunk, None] + gp[None, :] > budget] = -np.inf
+        value = value.ravel()
+        top = value[np.argpartition(value, -k)[-k:]] if len(value) > k else value
+        best = np.sort(np.concatenate([best, top[np.isfinite(top)]]))[-k:]
+    return best[::-1].tolist()
+
+
+def cross_join(cpu, gpu, budget, k):
+    pairs = cpu[["Price", "PassMark_Score"]].merge(gpu[["Price", "PassMark_Score"]], how="cross")
+    pairs = pairs[pairs["Price_x"] + pairs["Price_y"] <= budget]
+    return (pairs["PassMark_Score_x"] + pairs["PassMark_Score_y"]).nlargest(k).tolist()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parts", type=int, nargs="+", default=[1000, 10000], help="Parts per catalog")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[400, 1000, 2500])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Timed optimizer queries per budget")
+    parser.add_argument("--cross-join-max", type=int, default=3000)
+    args = parser.parse_args()
+
+    for n in args.parts:
+        cpu, gpu = make_catalog(n, "CPU", seed=1), make_catalog(n, "GPU", seed=2)
+        optimizer, build_s = timed(BuildOptimizer.from_frames, cpu, gpu)
+        print(f"== {n} x {n} parts: optimizer built in {build_s * 1e3:.1f} ms, "
+              f"frontiers {len(optimizer.cpus)} CPUs x {len(optimizer.gpus)} GPUs ==")
+        for budget in args.budgets:
+            builds = optimizer.best(budget, args.k)
+            samples = []
+            for _ in range(args.queries):
+                start = time.perf_counter()
+                optimizer.best(budget, args.k)
+                samples.append(time.perf_counter() - start)
+            expected, brute_s = timed(brute_force, cpu, gpu, budget, args.k)
+            got = [value for value, *_ in builds]
+            assert np.allclose(got, expected), (budget, got, expected)
+            line = (f"  budget ${budget:>7.0f}  sweep p50 {percentiles(samples)['p50_us'] / 1e3:7.2f} ms   "
+                    f"brute force {brute_s * 1e3:9.1f} ms")
+            if n <= args.cross_join_max:
+                joined, join_s = timed(cross_join, cpu, gpu, budget, args.k)
+                assert np.allclose(joined, expected)
+                line += f"   cross join {join_s * 1e3:9.1f} ms"
+            best = optimizer.describe(builds[:1])
+            if best:
+                line += f"   best {best[0]['objective']:.0f} for ${best[0]['total_price']:.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
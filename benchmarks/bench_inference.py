@@ -0,0 +1,70 @@
+"""
+Checks that the NumPy evaluator in oblivious.py reproduces
+CatBoostRegressor.predict and compares their throughput at several batch sizes.
+
+    python benchmarks/bench_inference.py [--rows 1 100 10000 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from catboost import CatBoostRegressor
+
+from synthetic import make_catalog, train_model
+import predict
+from oblivious import ObliviousTrees, export_path
+
+
+def throughput(model, features, repeat):
+    predict.predict_batch(model, features)  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict.predict_batch(model, features)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10_000, 100_000])
+    parser.add_argument("--check-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # GPU-shaped catalog: three brands once missing ones become "Unknown"
+    df = make_catalog(5000, "GPU")
+    df.loc[::4, "Brand"] = None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = train_model(df, os.path.join(tmp, "gpu.cbm"), "GPU")
+        native = CatBoostRegressor()
+        native.load_model(path)
+        exported = ObliviousTrees.load(export_path(path))
+        size_cbm, size_npz = os.path.getsize(path), os.path.getsize(export_path(path))
+
+    pool = predict.features_from_frame(make_catalog(max(args.rows + [args.check_rows]), "GPU", seed=1))
+    pool.loc[::7, "Brand"] = "Unknown"
+    pool.loc[::11, "Brand"] = "Matrox"  # brand never seen in training
+
+    check = pool.head(args.check_rows)
+    num = np.ascontiguousarray(check[predict.NUMERIC_FEATURES].to_numpy(dtype=np.float32))
+    brands = check["Brand"].to_numpy(dtype=object)
+    expected = predict.raw_predict(native, num, brands)
+    actual = exported.predict_arrays(num, brands)
+    print(f"Equality over {len(check)} rows: max |diff| {np.abs(actual - expected).max():.3g}, "
+          f"identical {np.mean(actual == expected):.2%}, "
+          f"same price in cents {np.mean(np.round(np.expm1(actual), 2) == np.round(np.expm1(expected), 2)):.2%}")
+    print(f"Model files: .cbm {size_cbm / 1024:.0f} KB, .npz {size_npz / 1024:.0f} KB "
+          f"({len(exported.leaf_values)} trees, depth {exported.split_feature.shape[1]})")
+
+    print(f"{'rows':>8} {'catboost rows/s':>16} {'numpy rows/s':>14}")
+    for n in args.rows:
+        features = pool.head(n)
+        repeat = max(3, min(200, 20000 // n))
+        t_native = throughput(native, features, repeat)
+        t_numpy = throughput(exported, features, repeat)
+        print(f"{n:>8} {n / t_native:>16,.0f} {n / t_numpy:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
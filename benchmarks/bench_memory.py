@@ -0,0 +1,120 @@
+"""
+Resident memory of the cleaned catalogs as the serving process holds them.
+The default pandas layout (object names, float64/int64 numbers) was loaded
+separately by the API and the embedded UI. The compact layout from
+storage.load_shared (float32/int32 numbers, interned names) is loaded once
+and shared. The serving modes include the name/price indexes and the model
+price tables. Each mode runs in a fresh process on a synthetic project, and
+the script checks that both layouts give identical predictions.
+
+    python benchmarks/bench_memory.py [--parts 1000000]
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from synthetic import make_catalog, train_model
+import storage
+from neighbors import PriceIndex
+from pricetable import PriceTable, table_name
+
+MODES = {
+    "frames (default)": "frames_default",
+    "frames (compact)": "frames_compact",
+    "serving, API + UI (default)": "serving_default",
+    "serving, API + UI (compact)": "serving_compact",
+}
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def load(root, mode):
+    """
+    Loads both catalogs the way `mode` describes; returns the objects to keep alive.
+    """
+    labels = ("CPU", "GPU")
+    if mode == "frames_default":
+        return [storage.load_frame(root, f"{label.lower()}_clean") for label in labels]
+    if mode == "frames_compact":
+        return [storage.load_shared(root, f"{label.lower()}_clean", label) for label in labels]
+    tables = [PriceTable(storage.load_frame(root, table_name(label))) for label in labels]
+    if mode == "serving_default":
+        # The API and the embedded UI each loaded the frames and built an index
+        return tables + [PriceIndex(storage.load_frame(root, f"{label.lower()}_clean"), label)
+                         for _ in ("api", "ui") for label in labels]
+    # The UI reuses the API's indexes over the shared frames
+    return tables + [PriceIndex(storage.load_shared(root, f"{label.lower()}_clean", label), label)
+                     for label in labels]
+
+
+def child(root, mode):
+    gc.collect()
+    before = rss_mb()
+    kept = load(root, mode)
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    frames = {id(df): df for df in (getattr(obj, "df", obj) for obj in kept) if hasattr(df, "columns")}
+    print(json.dumps({
+        "before_mb": round(before, 1),
+        "after_mb": round(rss_mb(), 1),
+        "frames_mb": round(sum(df.memory_usage(deep=True).sum() for df in frames.values()) / 2**20, 1),
+        "frame_copies": len(frames),
+    }))
+
+
+def check_predictions(root, rows):
+    """
+    True if a model scores the default and compact frames identically.
+    """
+    import predict
+    from catboost import CatBoostRegressor
+
+    path = train_model(make_catalog(20000, "CPU", seed=3), os.path.join(root, "model", "check.cbm"))
+    model = CatBoostRegressor()
+    model.load_model(path)
+    default = storage.load_frame(root, "cpu_clean").head(rows)
+    compact = storage.compact(default, "CPU")
+    return np.array_equal(predict.predict_batch(model, predict.features_from_frame(default)),
+                          predict.predict_batch(model, predict.features_from_frame(compact)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parts", type=int, default=1_000_000, help="Parts in each of the CPU and GPU catalogs")
+    parser.add_argument("--check-rows", type=int, default=200_000, help="Rows scored by the prediction check")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as root:
+        for label, seed in (("CPU", 1), ("GPU", 2)):
+            df = make_catalog(args.parts, label, seed)
+            storage.save_frame(df, root, f"{label.lower()}_clean", csv=False)
+            storage.save_frame(pd.DataFrame({"name": df[label], "estimated_price": df["Price"] * 1.05}),
+                               root, f"{label.lower()}_price_table", csv=False)
+        print(f"== {args.parts:,} CPUs + {args.parts:,} GPUs ==")
+        print(f"{'':<30}{'RSS growth':>12}{'frames':>10}{'copies':>8}")
+        for name, mode in MODES.items():
+            out = subprocess.run([sys.executable, __file__, "--child", root, mode],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{name:<30}{r['after_mb'] - r['before_mb']:>9.0f} MB{r['frames_mb']:>7.0f} MB{r['frame_copies']:>8}")
+        print(f"identical predictions on {args.check_rows:,} rows: {check_predictions(root, args.check_rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Part-name resolution with src/namesearch.py: index build time, and query
+latency and top-1 accuracy for exact names, reworded names, typos and
+typeahead prefixes. These are compared with the DataFrame scans a lookup
+needs without the index (exact == match, case-insensitive substring search).
+
+    python benchmarks/bench_name_search.py [--names 10000 100000 200000] [--queries 500]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+import synthetic  # noqa: F401 (puts src/ on the path)
+from synthetic import percentiles
+from namesearch import NameIndex
+
+SERIES = ["AMD Ryzen 3", "AMD Ryzen 5", "AMD Ryzen 7", "AMD Ryzen 9", "AMD Ryzen Threadripper", "AMD EPYC",
+          "Intel Core i3", "Intel Core i5", "Intel Core i7", "Intel Core i9", "Intel Xeon W", "Intel Xeon Gold",
+          "NVIDIA GeForce RTX", "NVIDIA GeForce GTX", "NVIDIA Quadro RTX", "AMD Radeon RX", "AMD Radeon Pro"]
+SUFFIXES = ["", "X", "K", "KF", "F", "U", "H", "HX", "X3D", " Ti", " SUPER", " XT", " Mobile"]
+
+
+def make_names(n, seed=0):
+    """
+    Unique PassMark-style part names ("Intel Core i7-12700K", "AMD Radeon RX 6800 XT").
+    """
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < n:
+        for series, number, suffix in zip(rng.choice(SERIES, n), rng.integers(100, 99999, n), rng.choice(SUFFIXES, n)):
+            sep = "-" if series.startswith("Intel Core") else " "
+            names.add(f"{series}{sep}{number}{suffix}")
+    return sorted(names)[:n]
+
+
+def queries(names, count, rng):
+    """
+    (kind, query, intended name) triples.
+    """
+    out = []
+    for name in rng.choice(names, count):
+        words = name.split()
+        out.append(("exact", name, name))
+        out.append(("reworded", " ".join(words[1:]).lower().replace("-", " "), name))
+        pos = int(rng.integers(len(name) // 2, len(name)))
+        out.append(("typo", name[:pos] + name[pos + 1:], name))
+        out.append(("prefix", name[:max(3, int(len(name) * 0.7))], None))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, nargs="+", default=[10000, 100000, 200000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--scans", type=int, default=50, help="Queries timed with the DataFrame scans")
+    args = parser.parse_args()
+    rng = np.random.default_rng(1)
+
+    for n in args.names:
+        names = make_names(n)
+        start = time.perf_counter()
+        index = NameIndex(names)
+        print(f"== {n} names: index built in {time.perf_counter() - start:.2f} s ==")
+
+        samples, hits = {}, {}
+        for kind, query, expected in queries(names, args.queries, rng):
+            start = time.perf_counter()
+            matches = index.search(query, 5)
+            samples.setdefault(kind, []).append(time.perf_counter() - start)
+            if expected is not None:
+                hits[kind] = hits.get(kind, 0) + (bool(matches) and matches[0][0] == expected)
+        for kind, times in samples.items():
+            p = percentiles(times)
+            accuracy = f"   top-1 {hits[kind] / len(times):6.1%}" if kind in hits else ""
+            print(f"  search {kind:<9} p50 {p['p50_us']:8.1f} us   p99 {p['p99_us']:8.1f} us{accuracy}")
+
+        resolve = []
+        for name in rng.choice(names, args.queries):
+            start = time.perf_counter()
+            index.resolve(name.upper())
+            resolve.append(time.perf_counter() - start)
+        print(f"  resolve exact      p50 {percentiles(resolve)['p50_us']:8.1f} us")
+
+        df = pd.DataFrame({"CPU": names})
+        exact, contains = [], []
+        for name in rng.choice(names, args.scans):
+            start = time.perf_counter()
+            df[df["CPU"] == name]
+            exact.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            df[df["CPU"].str.contains(name[4:].lower(), case=False, regex=False)]
+            contains.append(time.perf_counter() - start)
+        print(f"  DataFrame ==       p50 {percentiles(exact)['p50_us']:8.1f} us")
+        print(f"  DataFrame contains p50 {percentiles(contains)['p50_us']:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
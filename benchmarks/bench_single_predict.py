@@ -0,0 +1,66 @@
+"""
+Compares single-row inference latency of the original DataFrame path
+against the FeaturesData fast path in predict.py, and the fast path
+behind a warm PredictionCache (repeated payloads, as in production traffic).
+
+    python benchmarks/bench_single_predict.py [--requests 5000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+
+from synthetic import make_catalog, train_model, percentiles
+import predict
+from predcache import PredictionCache
+
+
+def time_calls(fn, payloads):
+    fn(payloads[0])  # warm-up
+    samples = []
+    for payload in payloads:
+        start = time.perf_counter()
+        fn(payload)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    df = make_catalog(2000)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = CatBoostRegressor()
+        model.load_model(train_model(df, os.path.join(tmp, "cpu.cbm")))
+
+    payloads = df[predict.FEATURES].sample(args.requests, replace=True, random_state=0).to_dict("records")
+    # Production traffic concentrates on popular parts: draw from the top 200
+    popular = df[predict.FEATURES].head(200).sample(args.requests, replace=True, random_state=1).to_dict("records")
+
+    def dataframe_path(data):
+        return round(float(np.expm1(model.predict(pd.DataFrame([data])))[0]), 2)
+
+    def fast_path(data):
+        return predict.predict_one(model, data)
+
+    cache = PredictionCache("CPU")
+
+    def cached_path(data):
+        return cache.predict(model, "bench", data)
+
+    assert all(dataframe_path(p) == fast_path(p) == cached_path(p) for p in payloads[:200])
+
+    print(f"Single-row predict latency over {args.requests} requests")
+    print(f"  DataFrame path: {time_calls(dataframe_path, payloads)}")
+    print(f"  Fast path:      {time_calls(fast_path, payloads)}")
+    print(f"  Cached:         {time_calls(cached_path, popular)} (200 popular parts)")
+    print(f"  Cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cold-start check for the entry points. Each module is imported in a fresh
+interpreter under `python -X importtime`; the script reports wall time and
+the heaviest direct imports, fails if a module pulls in a dependency it
+should load lazily, and fails if the API process (models loaded and
+warmed on a synthetic project) exceeds its startup budget.
+
+    python benchmarks/bench_startup.py [--runs 5] [--api-budget-ms 3000]
+
+Exits with status 1 on any violation, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import PROJECT_ROOT, make_catalog, train_model
+import storage
+
+SRC = os.path.join(PROJECT_ROOT, "src")
+
+# Entry point -> dependencies it must not import at startup
+LAZY = {
+    "main": ["pandas", "matplotlib", "seaborn", "catboost", "sklearn", "bs4", "requests"],
+    "eda": ["matplotlib", "seaborn"],
+    "scraper": ["bs4", "matplotlib", "catboost"],
+    "api": ["matplotlib", "seaborn", "sklearn", "bs4"],
+}
+
+
+def make_project(root):
+    """
+    Synthetic project root with cleaned catalogs and trained models, enough for the API to start.
+    """
+    for label in ("CPU", "GPU"):
+        df = make_catalog(2000, label)
+        storage.save_frame(df, root, f"{label.lower()}_clean")
+        train_model(df, os.path.join(root, "model", f"{label.lower()}_price_model_catboost.cbm"), label)
+
+
+def parse_importtime(stderr, module):
+    """
+    Cumulative microseconds of each direct import of `module`, heaviest first.
+    """
+    # Children are printed before their parent, one indent level (2 spaces) deeper
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                return sorted(children, reverse=True)
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return []
+
+
+def cold_start(module, env, runs):
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    walls, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=SRC, env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(walls) * 1000, loaded, parse_importtime(result.stderr, module)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--api-budget-ms", type=float, default=3000,
+                        help="Maximum median cold start of the API process")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per module")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as root:
+        make_project(root)
+        env = dict(os.environ, PROJECT_ROOT=root, MODEL_WATCH_INTERVAL="0")
+
+        for module, forbidden in LAZY.items():
+            wall_ms, loaded, heaviest = cold_start(module, env, args.runs)
+            eager = [dep for dep in forbidden if dep in loaded]
+            print(f"import {module:<8} {wall_ms:8.1f} ms (median of {args.runs})")
+            for cumulative, name in heaviest[:args.top]:
+                print(f"    {name:<24} {cumulative / 1000:8.1f} ms")
+            if eager:
+                failures.append(f"{module} imports {', '.join(eager)} at startup")
+            if module == "api" and wall_ms > args.api_budget_ms:
+                failures.append(f"API cold start {wall_ms:.0f} ms exceeds budget of {args.api_budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares loading a cleaned catalog from CSV (full type inference) against
+the typed, memory-mapped Parquet files written by storage.py.
+
+    python benchmarks/bench_storage.py [--rows 100000 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+
+from synthetic import make_catalog
+import storage
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for n in args.rows:
+            df = make_catalog(n)
+            csv_path = storage.dataset_path(root, "cpu_clean", "csv")
+            _, t_csv_write = timed(lambda: storage.save_frame(df, root, "cpu_clean", csv=True), repeat=1)
+            _, t_pq_write = timed(lambda: storage.save_frame(df, root, "cpu_clean", csv=False), repeat=1)
+
+            from_csv, t_csv = timed(pd.read_csv, csv_path)
+            from_pq, t_pq = timed(storage.load_frame, root, "cpu_clean")
+
+            print(f"{n:,} rows")
+            print(f"  write csv+parquet {t_csv_write:6.2f}s   parquet only {t_pq_write:6.2f}s")
+            for name, frame, t, path in (("csv", from_csv, t_csv, csv_path),
+                                         ("parquet", from_pq, t_pq, storage.dataset_path(root, "cpu_clean"))):
+                mem = frame.memory_usage(deep=True).sum() / 2**20
+                size = os.path.getsize(path) / 2**20
+                print(f"  load {name:8} {t:6.3f}s   file {size:7.1f} MB   in memory {mem:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares PassMark list-page parsing: the original BeautifulSoup per-row loop,
+the BeautifulSoup fallback in tableparse.py, and the streaming extractor.
+
+    python benchmarks/bench_table_parse.py [--rows 5000 50000] [--html saved_page.html]
+"""
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import synthetic  # noqa: F401 (puts src/ on the path)
+from fixtures import saved_fixture
+import tableparse
+
+
+def legacy_parse(html, name_col):
+    """
+    The per-row loop scraper.py used before tableparse.py.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = soup.find('table', {'id': 'cputable'}).find_all('tr')
+    data = []
+    for row in rows[1:]:
+        cols = row.find_all('td')
+        if len(cols) < 5:
+            continue
+        name = cols[0].get_text(strip=True)
+        score = cols[1].get_text(strip=True).replace(",", "")
+        rank = cols[2].get_text(strip=True).replace(",", "")
+        value = cols[3].get_text(strip=True)
+        price = cols[4].get_text(strip=True).replace("$", "").replace("*", "").replace(",", "")
+        try:
+            data.append({
+                name_col: name,
+                "PassMark_Score": int(score) if score != "NA" else None,
+                "Rank": int(rank) if rank != "NA" else None,
+                "ValueScore": float(value) if value != "NA" else None,
+                "Price": float(price) if price != "NA" else None
+            })
+        except:
+            continue
+    return pd.DataFrame(data)
+
+
+def measure(fn, *args):
+    """
+    Times one untraced call, then repeats it under tracemalloc for peak memory.
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--html", nargs="*", default=[], help="Extra saved list pages to parse")
+    args = parser.parse_args()
+
+    paths = [saved_fixture(n) for n in args.rows] + args.html
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        print(f"{path} ({len(html) / 2**20:.1f} MB)")
+
+        expected, t, mem = measure(legacy_parse, html, "CPU")
+        print(f"  legacy bs4 loop: {t:7.3f}s  peak {mem:7.1f} MB  rows {len(expected)}")
+        for name in ("bs4", "stream"):
+            (df, _), t, mem = measure(tableparse.parse_passmark_table, html, "CPU", "cputable", name)
+            pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+            print(f"  tableparse {name:6}: {t:7.3f}s  peak {mem:7.1f} MB  rows {len(df)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Click-to-render latency of the Streamlit UI's "Estimate Values" button,
+measured with Streamlit's AppTest harness on a synthetic project: once with
+the API embedded in the app process and once against a separately running API
+(API_URL). Each mode runs in its own process.
+
+    python benchmarks/bench_ui_estimate.py [--parts 2000] [--clicks 30] [--app src/app.py]
+
+Clicks cycle through --distinct part pairs, so after the first round every
+click repeats a selection (as when a user toggles between a few parts).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from synthetic import PROJECT_ROOT, make_catalog, percentiles, train_model
+
+
+def build_project(root, parts):
+    import storage
+    import pricetable
+
+    for label in ("CPU", "GPU"):
+        df = make_catalog(parts, label, seed=len(label))
+        storage.save_frame(df, root, f"{label.lower()}_clean")
+        train_model(df, pricetable.model_path(root, label), label)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(app_path, mode, clicks, distinct):
+    """
+    Runs in the child process: loads the page, then times each click's rerun.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    if mode == "remote":
+        import api
+        port = free_port()
+        threading.Thread(target=api.run_flask, args=("127.0.0.1", port), daemon=True).start()
+        time.sleep(1)
+        os.environ["API_URL"] = f"http://127.0.0.1:{port}"
+    else:
+        os.environ.pop("API_URL", None)
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    page_load = time.perf_counter() - start
+
+    first, new, repeated = None, [], []
+    for i in range(clicks):
+        pair = i % distinct
+        at.selectbox[0].select_index(pair)
+        at.selectbox[1].select_index(pair)
+        at.run()  # the selection change itself, not timed
+        at.button[0].click()
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        if at.exception or at.error or len(at.success) != 2:
+            raise RuntimeError(f"Click {i} did not render both estimates: {at.exception or at.error}")
+        if i == 0:
+            first = elapsed
+        (new if i < distinct else repeated).append(elapsed)
+
+    return {"mode": mode, "page_load": page_load, "first_click": first,
+            "new_part": percentiles(new[1:] or new), "repeat_part": percentiles(repeated or new)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default=os.path.join(PROJECT_ROOT, "src", "app.py"))
+    parser.add_argument("--parts", type=int, default=2000, help="Catalog size per component")
+    parser.add_argument("--clicks", type=int, default=30)
+    parser.add_argument("--distinct", type=int, default=5, help="Distinct part pairs cycled through")
+    parser.add_argument("--modes", nargs="+", choices=["embedded", "remote"], default=["embedded", "remote"])
+    parser.add_argument("--child", choices=["embedded", "remote"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.app, args.child, args.clicks, args.distinct)))
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        build_project(root, args.parts)
+        env = {**os.environ, "PROJECT_ROOT": root, "MODEL_WATCH_INTERVAL": "0"}
+        env.pop("API_URL", None)
+        print(f"{'mode':<10}{'page load':>11}{'1st click':>11}{'new p50':>10}{'new p99':>10}"
+              f"{'repeat p50':>12}{'repeat p99':>12}  (ms)")
+        for mode in args.modes:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--app", args.app,
+                 "--clicks", str(args.clicks), "--distinct", str(args.distinct)],
+                env=env, cwd=root, capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                sys.exit(f"{mode} run failed:\n{out.stderr[-2000:]}")
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            new, repeat = r["new_part"], r["repeat_part"]
+            print(f"{mode:<10}{r['page_load'] * 1e3:>11.0f}{r['first_click'] * 1e3:>11.1f}"
+                  f"{new['p50_us'] / 1e3:>10.1f}{new['p99_us'] / 1e3:>10.1f}"
+                  f"{repeat['p50_us'] / 1e3:>12.1f}{repeat['p99_us'] / 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def passmark_list_html(n, label="CPU", seed=0):
+    """
+    Renders a PassMark-style list page (table id "cputable") with n parts,
+    including the quirks of the real pages: thousands separators, "NA" cells,
+    starred prices, HTML entities and a surrounding page of unrelated markup.
+    """
+    rng = np.random.default_rng(seed)
+    score = rng.integers(500, 60000, n)
+    price = np.round(score / 40 * rng.uniform(0.5, 1.5, n) + 20, 2)
+    brand = "Intel" if label == "CPU" else "NVIDIA"
+
+    rows = []
+    for i in range(n):
+        na = i % 17 == 0
+        value = "NA" if na else f"{score[i] / price[i]:.2f}"
+        cost = "NA" if na else f"${price[i]:,.2f}" + ("*" if i % 3 == 0 else "")
+        rows.append(
+            f'<tr id="{label.lower()}{i}"><td><a href="{label.lower()}.php?id={i}">'
+            f'{brand} Part&nbsp;{i} &amp; Co</a></td><td>{score[i]:,}</td>'
+            f'<td>{i + 1:,}</td><td>{value}</td><td>{cost}</td></tr>'
+        )
+    nav = "".join(f'<li><a href="/page{i}">Link {i}</a></li>' for i in range(500))
+    return (
+        "<!DOCTYPE html><html><head><title>PassMark</title></head><body>"
+        f"<ul>{nav}</ul><table id=\"cputable\"><thead><tr><th>Name</th><th>Mark</th>"
+        f"<th>Rank</th><th>Value</th><th>Price</th></tr></thead><tbody>{''.join(rows)}"
+        f"</tbody></table><div id=\"footer\">{nav}</div></body></html>"
+    )
+
+
+def saved_fixture(n, label="CPU"):
+    """
+    Returns the path of a saved HTML fixture with n rows, writing it on first use.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"{label.lower()}_list_{n}.html")
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(passmark_list_html(n, label))
+    return path
@@ -0,0 +1,297 @@
+"""
+Benchmark suite for the pipeline and serving hot paths, on synthetic
+PassMark-shaped data and saved HTML fixtures. Every (case, size) runs in a
+fresh process and reports its best wall time over --repeat runs and the
+peak resident memory of one run. Results are written as JSON and, with
+--baseline, compared against a stored run.
+
+    python benchmarks/suite.py --sizes 1000 10000 100000 [--cases parse clean]
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.25
+
+Exits with status 1 if any case regresses past the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from synthetic import PROJECT_ROOT, make_catalog, make_raw_catalog, train_model
+from fixtures import saved_fixture
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+# ---- cases: setup(n, workdir) builds the inputs, run(inputs) is what is timed ----
+
+def setup_parse(n, workdir):
+    import tableparse, bs4  # noqa: F401 -- keep import cost out of the measurement
+    with open(saved_fixture(n), encoding="utf-8") as f:
+        return f.read()
+
+
+def run_parse_stream(html):
+    import tableparse
+    tableparse.parse_passmark_table(html, "CPU", parser="stream")
+
+
+def run_parse_bs4(html):
+    import tableparse
+    tableparse.parse_passmark_table(html, "CPU", parser="bs4")
+
+
+def setup_clean(n, workdir):
+    return make_raw_catalog(n, "CPU"), make_raw_catalog(n, "GPU", seed=1), workdir
+
+
+def run_clean(inputs):
+    import preproc
+    cpu_df, gpu_df, workdir = inputs
+    preproc.clean_data(cpu_df.copy(), gpu_df.copy(), workdir)
+
+
+def setup_outliers(n, workdir):
+    return make_raw_catalog(n, "CPU").dropna()
+
+
+def run_outliers(df):
+    import preproc
+    preproc.remove_price_outliers(df)
+
+
+def setup_train(n, workdir):
+    import cat  # noqa: F401
+    return make_catalog(n), workdir
+
+
+def run_train(inputs):
+    import cat
+    df, workdir = inputs
+    cat.train_component(df, workdir, "CPU", thread_count=1)
+
+
+def trained_model(workdir, backend="catboost"):
+    path = train_model(make_catalog(2000), os.path.join(workdir, "model", "cpu.cbm"))
+    if backend == "numpy":
+        from oblivious import ObliviousTrees, export_path
+        return ObliviousTrees.load(export_path(path))
+    from catboost import CatBoostRegressor
+    model = CatBoostRegressor()
+    model.load_model(path)
+    return model
+
+
+def setup_predict_single(n, workdir):
+    import predict
+    payloads = make_catalog(n, seed=1)[predict.FEATURES].to_dict("records")
+    return trained_model(workdir), payloads
+
+
+def run_predict_single(inputs):
+    import predict
+    model, payloads = inputs
+    for payload in payloads:
+        predict.predict_one(model, payload)
+
+
+def setup_predict_batch(n, workdir, backend="catboost"):
+    import predict
+    records = make_catalog(n, seed=1)[predict.FEATURES].to_dict("records")
+    return trained_model(workdir, backend), records
+
+
+def setup_predict_batch_numpy(n, workdir):
+    return setup_predict_batch(n, workdir, "numpy")
+
+
+def run_predict_batch(inputs):
+    import predict
+    model, records = inputs
+    predict.predict_batch(model, predict.validate_batch(records, max_rows=len(records)))
+
+
+# name -> (setup, run, largest size run by default, what a "row" is)
+CASES = {
+    "parse_stream": (setup_parse, run_parse_stream, None, "table rows"),
+    "parse_bs4": (setup_parse, run_parse_bs4, 100_000, "table rows"),
+    "clean": (setup_clean, run_clean, None, "rows per component"),
+    "outliers": (setup_outliers, run_outliers, None, "rows"),
+    "train": (setup_train, run_train, 100_000, "training rows"),
+    "predict_single": (setup_predict_single, run_predict_single, 100_000, "requests"),
+    "predict_batch": (setup_predict_batch, run_predict_batch, None, "rows"),
+    "predict_batch_numpy": (setup_predict_batch_numpy, run_predict_batch, None, "rows"),
+}
+
+
+def reset_peak_rss():
+    """
+    Resets the kernel's peak-RSS counter (Linux); returns False if unsupported.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB (VmHWM, else ru_maxrss).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return 0.0
+
+
+def measure(case, n, repeat, traced):
+    """
+    Runs in a fresh worker process: builds the inputs, times `repeat` runs and
+    measures the peak memory of the first one above the post-setup baseline.
+    """
+    setup, run, _, _ = CASES[case]
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(workdir)  # CatBoost writes catboost_info/ into the working directory
+        inputs = setup(n, workdir)
+
+        resettable = reset_peak_rss()
+        baseline = current_rss_mb()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(inputs)
+            times.append(time.perf_counter() - start)
+            if len(times) == 1:
+                peak_rss = peak_rss_mb() - baseline
+
+        result = {
+            "case": case,
+            "rows": n,
+            "seconds": round(min(times), 6),
+            "peak_rss_mb": round(peak_rss, 2) if resettable else None,
+            "repeat": repeat,
+        }
+        if traced:
+            tracemalloc.start()
+            run(inputs)
+            result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+        os.chdir(PROJECT_ROOT)
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the cases whose time (or peak memory, if above 1 MB) grew by
+    more than `tolerance` relative to the baseline run.
+    """
+    previous = {(r["case"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<22}{'rows':>10}{'time':>10}{'vs base':>9}{'peak MB':>10}{'vs base':>9}")
+    for r in results:
+        base = previous.get((r["case"], r["rows"]))
+        if base is None:
+            continue
+        time_ratio = r["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        mem_ratio = None
+        if r["peak_rss_mb"] is not None and (base.get("peak_rss_mb") or 0) > 1:
+            mem_ratio = r["peak_rss_mb"] / base["peak_rss_mb"]
+        flags = []
+        if time_ratio > 1 + tolerance:
+            flags.append("time")
+        if mem_ratio is not None and mem_ratio > 1 + tolerance:
+            flags.append("memory")
+        mem_text = f"{mem_ratio:8.2f}x" if mem_ratio is not None else f"{'-':>9}"
+        print(f"{r['case']:<22}{r['rows']:>10}{r['seconds']:>9.3f}s{time_ratio:>8.2f}x"
+              f"{r['peak_rss_mb'] or 0:>10.1f}{mem_text}  {'REGRESSION: ' + ', '.join(flags) if flags else ''}")
+        if flags:
+            regressions.append({**r, "regressed": flags, "baseline": base})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept")
+    parser.add_argument("--no-limits", action="store_true",
+                        help="Also run slow cases (bs4 parsing, training, single predict) above 100k rows")
+    parser.add_argument("--traced", action="store_true",
+                        help="Also report the tracemalloc peak of Python/NumPy allocations (one extra run)")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown / memory growth before a case counts as regressed")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'case':<22}{'rows':>10}{'time':>11}{'rows/s':>14}{'peak MB':>10}")
+    for case in args.cases:
+        limit = CASES[case][2]
+        for n in args.sizes:
+            if limit and n > limit and not args.no_limits:
+                print(f"{case:<22}{n:>10}  skipped (above {limit:,} {CASES[case][3]}; use --no-limits)")
+                continue
+            # One task per process, so each measurement starts from a clean heap
+            with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+                result = pool.submit(measure, case, n, args.repeat, args.traced).result()
+            results.append(result)
+            peak = f"{result['peak_rss_mb']:10.1f}" if result["peak_rss_mb"] is not None else f"{'-':>10}"
+            print(f"{case:<22}{n:>10}{result['seconds']:>10.4f}s{n / result['seconds']:>14,.0f}{peak}")
+
+    report = {"environment": environment(), "sizes": args.sizes, "results": results}
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+BRANDS = {"CPU": ["Intel", "AMD"], "GPU": ["NVIDIA", "AMD"]}
+
+
+def make_catalog(n, label="CPU", seed=0):
+    """
+    Builds a synthetic PassMark-shaped cleaned frame with n parts.
+    """
+    rng = np.random.default_rng(seed)
+    score = rng.integers(500, 60000, n)
+    price = np.round(score / 40 * rng.uniform(0.5, 1.5, n) + 20, 2)
+    brand = rng.choice(BRANDS[label], n)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.argsort(-score, kind="stable")] = np.arange(1, n + 1)
+    return pd.DataFrame({
+        label: [f"{b} {label}-{i}" for i, b in enumerate(brand)],
+        "PassMark_Score": score,
+        "Rank": rank,
+        "ValueScore": np.round(score / price, 2),
+        "Price": price,
+        "Brand": brand,
+    })
+
+
+def make_raw_catalog(n, label="CPU", seed=0):
+    """
+    Builds a synthetic scraped (pre-clean) list with n parts: the columns
+    scrape_component saves, with the gaps and junk rows clean_data removes.
+    """
+    df = make_catalog(n, label, seed).drop(columns="Brand")
+    rng = np.random.default_rng(seed + 1)
+    missing = rng.random(n) < 0.05
+    df.loc[missing, "Price"] = np.nan
+    df.loc[missing, "ValueScore"] = np.nan
+    junk = np.flatnonzero(rng.random(n) < 0.01)
+    df.loc[junk, label] = [f"Unknown {label} Engineering Sample {i}" for i in junk]
+    df.loc[rng.random(n) < 0.01, "Price"] *= 50  # price outliers
+    return df[[label, "PassMark_Score", "Rank", "ValueScore", "Price"]]
+
+
+def train_model(df, model_path, label="CPU"):
+    """
+    Trains a model on a synthetic frame with the project's fit and save
+    helpers (the ones cat.train_component uses), at any model path.
+    """
+    from preproc import preprocess_for_catboost
+    from cat import fit_model, holdout_mask, load_params, save_model
+
+    X, y, cat_features = preprocess_for_catboost(df)
+    train = ~holdout_mask(df[label])
+    model = fit_model(X[train], y[train], cat_features, load_params(model_path))
+    save_model(model, model_path, sorted(X["Brand"].unique()), label)
+    return model_path
+
+
+def percentiles(samples):
+    """
+    Returns p50/p99 of a list of durations in seconds, as microseconds.
+    """
+    p50, p99 = np.percentile(np.asarray(samples) * 1e6, [50, 99])
+    return {"p50_us": round(float(p50), 1), "p99_us": round(float(p99), 1)}
@@ -6,9 +6,16 @@
 #   - Scrapes data, cleans it, trains the model
 #   - Launches Streamlit (with embedded Flask)
 #
+# Usage: ./pc-value-estimator.sh [all|api|ui]
+#   all (default)  pipeline, then Streamlit with the API embedded on a thread
+#   api            pipeline, then only the prediction API under gunicorn (src/serve.py)
+#   ui             only Streamlit, talking to the API at $API_URL
+#
 
 set -e
 
+MODE="${1:-all}"
+
 # 1) Make sure we are running from the project root
 cd "$(dirname "$0")"
 
@@ -34,14 +41,26 @@ chmod +w data
 chmod +w model
 
 # 4) Run the scraper to create data/cpu_passmark.csv & data/gpu_passmark.csv
-echo "==> Running scraper..."
-python src/main.py
+if [ "$MODE" != "ui" ]; then
+    echo "==> Running scraper..."
+    python src/main.py
+fi
 
-# 5) Launch the combined Flask + Streamlit app
+# 5) Launch the standalone prediction API
+if [ "$MODE" = "api" ]; then
+    echo "==> Launching prediction API…"
+    exec python src/serve.py --port="${API_PORT:-${PORT:-5050}}"
+fi
+
+# 6) Launch the Streamlit app (with embedded Flask unless API_URL is set)
+if [ "$MODE" = "ui" ] && [ -z "$API_URL" ]; then
+    echo "API_URL must point at a running prediction API in ui mode" >&2
+    exit 1
+fi
 echo "==> Launching Streamlit app (with embedded Flask)…"
 which streamlit || echo "streamlit not found"
 exec streamlit run src/app.py \
-  --server.port=8080 \
+  --server.port="${PORT:-8080}" \
   --server.address=0.0.0.0 \
   --browser.serverAddress=localhost
 
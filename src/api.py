@@ -0,0 +1,498 @@
+import os
+import math
+import time
+import uuid
+from flask import Flask, Response, g, request, jsonify
+import metrics
+import predict
+import storage
+from builds import BuildOptimizer, MAX_BUILDS, OBJECTIVES
+from namesearch import NameIndex
+from neighbors import PriceIndex
+from registry import ModelRegistry
+
+flask_app = Flask(__name__)
+PROJECT_ROOT = os.environ.get(
+    "PROJECT_ROOT", os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+)
+# When set, POST /admin/reload requires this value in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Upper bound on k for the similar-part endpoints
+MAX_SIMILAR = 50
+# Upper bound on limit for /search
+MAX_SEARCH_RESULTS = 50
+
+# API_PROFILING=1 lets a request ask to be profiled with an X-Profile header
+# ("cprofile" or "pyinstrument"); profiles are written to PROFILE_DIR
+PROFILING = os.environ.get("API_PROFILING") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(PROJECT_ROOT, "profiles"))
+# File (or "-" for stdout) that gets one JSON timing line per batch request
+TIMING_LOG = os.environ.get("API_TIMING_LOG")
+
+
+def load_price_index(name, name_col):
+    """
+    Builds the price/name index over the compact, process-shared copy of a
+    cleaned catalog, or None if it is not on disk yet.
+    """
+    try:
+        return PriceIndex(storage.load_shared(PROJECT_ROOT, name, name_col), name_col)
+    except OSError as err:
+        print(f"[API] {name} not loaded: {err}")
+        return None
+
+
+cpu_index = load_price_index("cpu_clean", "CPU")
+gpu_index = load_price_index("gpu_clean", "GPU")
+# Free-text name resolution for /search and /predict_by_name
+name_indexes = {label: NameIndex(index.df[label])
+                for label, index in (("CPU", cpu_index), ("GPU", gpu_index)) if index is not None}
+
+# Both models are loaded and warmed here, at import; later retrains are
+# picked up by the registry's watcher or POST /admin/reload.
+registry = ModelRegistry(PROJECT_ROOT, indexes={"CPU": cpu_index, "GPU": gpu_index})
+
+# Build optimizers by price source. Listed prices only change with the
+# catalog; estimated ones are rebuilt when a model version changes.
+build_optimizers = {}
+
+
+def cache_metric(name, help_text, field, kind="counter"):
+    """
+    Exposes one PredictionCache.stats() field per model on /metrics.
+    """
+    read = lambda: {(label,): cache.stats().get(field, 0) for label, cache in registry.caches.items()}
+    return metrics.REGISTRY.add(metrics.CallbackMetric(name, help_text, ["model"], read, kind))
+
+
+cache_metric("pcv_cache_hits_total", "Single-row predictions served from the prediction cache.", "hits")
+cache_metric("pcv_cache_misses_total", "Single-row predictions scored by the model.", "misses")
+cache_metric("pcv_cache_evictions_total", "Prediction cache entries evicted to stay within its size.", "evictions")
+cache_metric("pcv_cache_entries", "Entries in the prediction cache.", "size", kind="gauge")
+
+
+def start_profiler():
+    """
+    Starts a profiler for this request if profiling is enabled and asked for
+    (and, with ADMIN_TOKEN set, the request carries the token).
+    Returns (kind, profiler) or None.
+    """
+    kind = request.headers.get("X-Profile", "").lower()
+    if not PROFILING or not kind:
+        return None
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return None
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return kind, profiler
+        except ImportError:
+            print("[API] pyinstrument is not installed, profiling with cProfile")
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as err:  # another request in this process is being profiled
+        print(f"[API] profiler not started: {err}")
+        return None
+    return "cprofile", profiler
+
+
+def save_profile(kind, profiler):
+    """
+    Stops the profiler and writes its output under PROFILE_DIR: a .prof file
+    for cProfile (pstats, snakeviz) or an HTML report for pyinstrument.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{request.endpoint or 'unmatched'}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    if kind == "pyinstrument":
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, stem + ".html")
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, stem + ".prof")
+        profiler.dump_stats(path)
+    return path
+
+
+@flask_app.before_request
+def start_request():
+    registry.ensure_watcher()
+    g.start = time.perf_counter()
+    g.timer = metrics.PhaseTimer(request.endpoint or "unmatched")
+    g.batch_rows = None
+    g.profiler = start_profiler()
+
+
+@flask_app.after_request
+def finish_request(response):
+    if g.profiler is not None:
+        response.headers["X-Profile-File"] = os.path.basename(save_profile(*g.profiler))
+    elapsed = time.perf_counter() - g.start
+    endpoint = g.timer.endpoint
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+    metrics.REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if TIMING_LOG and g.batch_rows is not None:
+        metrics.log_event(TIMING_LOG, {
+            "event": "batch_request",
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "rows": g.batch_rows,
+            "seconds": round(elapsed, 6),
+            "phases": {name: round(t, 6) for name, t in g.timer.phases.items()},
+        })
+    return response
+
+
+@flask_app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """
+    Request, batch, cache and model-load metrics of this worker in the Prometheus text format.
+    """
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@flask_app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness probe: 200 once both models are loaded and able to score,
+    with the version each one is serving.
+    """
+    if all(label in registry.models for label in ("CPU", "GPU")):
+        return jsonify({"status": "ready", "models": registry.versions()})
+    return jsonify({"status": "loading"}), 503
+
+
+@flask_app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    """
+    Reloads changed model files in this worker. The new models are loaded and
+    warmed in the background (?wait=1 blocks until they are swapped in);
+    ?force=1 reloads even if the files are unchanged.
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return jsonify({"error": "Forbidden"}), 403
+    label = request.args.get("model")
+    labels = [label.upper()] if label else None
+    if labels and labels[0] not in registry.models:
+        return jsonify({"error": f"Unknown model: {label}"}), 404
+    force = request.args.get("force") == "1"
+    if request.args.get("wait") == "1":
+        return jsonify({"reloaded": registry.reload(labels, force)})
+    registry.reload_async(labels, force)
+    return jsonify({"status": "reloading", "models": registry.versions()}), 202
+
+
+def price_lookup_response(loaded, name, label):
+    if not isinstance(name, str) or not name.strip():
+        return jsonify({"error": "'name' must be a non-empty string"}), 400
+    if loaded.prices is None:
+        return jsonify({"error": f"{label} price table is not loaded"}), 503
+    with g.timer.phase("predict"):
+        price = loaded.prices.get(name)
+    metrics.PRICE_LOOKUPS.inc(model=label, result="miss" if price is None else "hit")
+    if price is None:
+        return jsonify({"error": f"Unknown {label}: {name}"}), 404
+    with g.timer.phase("serialize"):
+        return jsonify({"name": name, "estimated_price": price, "model_version": loaded.version})
+
+
+def predict_response(label):
+    """
+    Known parts sent by name ({"name": ...} with no features) are answered
+    from the precomputed price table; feature payloads are scored by the model
+    through the prediction cache. Responses carry the model version used.
+    """
+    loaded = registry.get(label)
+    timer = g.timer
+    try:
+        with timer.phase("parse"):
+            data = request.get_json(force=True, silent=True)
+        if data is None:
+            raise predict.ValidationError("Malformed or empty JSON body")
+        if isinstance(data, dict) and "name" in data and not any(f in data for f in predict.FEATURES):
+            return price_lookup_response(loaded, data["name"], label)
+        with timer.phase("featurize"):
+            values, brand = predict.validate_record(data)
+        with timer.phase("predict"):
+            price = registry.caches[label].score(loaded.model, loaded.digest, values, brand)
+        metrics.PREDICTED_ROWS.inc(model=label, path="single")
+        with timer.phase("serialize"):
+            return jsonify({"estimated_price": price, "model_version": loaded.version})
+    except predict.ValidationError as err:
+        return jsonify({"error": str(err)}), err.status
+    except Exception as err:
+        print(f"[{label} ERROR] {err}")
+        return jsonify({"error": str(err)}), 500
+
+
+@flask_app.route("/predict_cpu", methods=["POST"])
+def predict_cpu():
+    return predict_response("CPU")
+
+
+@flask_app.route("/predict_gpu", methods=["POST"])
+def predict_gpu():
+    return predict_response("GPU")
+
+
+@flask_app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    """
+    Hit/miss/eviction counters of this worker's prediction caches.
+    """
+    return jsonify({label: cache.stats() for label, cache in registry.caches.items()})
+
+
+@flask_app.route("/price_cpu", methods=["GET"])
+def price_cpu():
+    return price_lookup_response(registry.get("CPU"), request.args.get("name"), "CPU")
+
+
+@flask_app.route("/price_gpu", methods=["GET"])
+def price_gpu():
+    return price_lookup_response(registry.get("GPU"), request.args.get("name"), "GPU")
+
+
+def predict_batch_response(label):
+    loaded = registry.get(label)
+    timer = g.timer
+    try:
+        with timer.phase("parse"):
+            records = predict.parse_batch_body(request.get_data(), request.content_type or "")
+        g.batch_rows = len(records)
+        with timer.phase("featurize"):
+            features_df = predict.validate_batch(records)
+        with timer.phase("predict"):
+            prices = predict.predict_batch(loaded.model, features_df)
+        metrics.BATCH_ROWS.observe(len(prices), model=label)
+        metrics.PREDICTED_ROWS.inc(len(prices), model=label, path="batch")
+        with timer.phase("serialize"):
+            return jsonify({"estimated_prices": prices.tolist(), "count": len(prices),
+                            "model_version": loaded.version})
+    except predict.ValidationError as err:
+        return jsonify({"error": str(err), "rows": err.rows[:100]}), err.status
+    except Exception as err:
+        print(f"[{label} BATCH ERROR] {err}")
+        return jsonify({"error": str(err)}), 500
+
+
+@flask_app.route("/predict_cpu/batch", methods=["POST"])
+def predict_cpu_batch():
+    return predict_batch_response("CPU")
+
+
+@flask_app.route("/predict_gpu/batch", methods=["POST"])
+def predict_gpu_batch():
+    return predict_batch_response("GPU")
+
+
+def similar_response(index, label):
+    if index is None:
+        return jsonify({"error": f"{label} catalog is not loaded"}), 503
+    name = request.args.get("name")
+    k = request.args.get("k", default=4, type=int)
+    if not name:
+        return jsonify({"error": "Missing 'name' query parameter"}), 400
+    if name not in index:
+        return jsonify({"error": f"Unknown {label}: {name}"}), 404
+
+    k = max(0, min(k, MAX_SIMILAR))
+    selected = index.describe([index.row(name)])[0]
+    selected["similar"] = index.describe(index.nearest(name, k))
+    return jsonify(selected)
+
+
+@flask_app.route("/similar_cpu", methods=["GET"])
+def similar_cpu():
+    return similar_response(cpu_index, "CPU")
+
+
+@flask_app.route("/similar_gpu", methods=["GET"])
+def similar_gpu():
+    return similar_response(gpu_index, "GPU")
+
+
+def catalog_response(index, label):
+    """
+    Names, scores and listed prices of one catalog, column-oriented, for a
+    UI that talks to this API and has no data/ directory of its own.
+    """
+    if index is None:
+        return jsonify({"error": f"{label} catalog is not loaded"}), 503
+    df = index.df
+    # Rounded to cents like every other price response (the compact catalogs hold float32)
+    prices = df[index.price_col].astype(float).round(2)
+    scores = df[index.score_col]
+    return jsonify({
+        index.name_col: df[index.name_col].tolist(),
+        index.score_col: scores.tolist() if scores.dtype.kind in "iu" else scores.astype(float).tolist(),
+        index.price_col: prices.astype(object).where(prices.notna(), None).tolist(),
+    })
+
+
+@flask_app.route("/catalog_cpu", methods=["GET"])
+def catalog_cpu():
+    return catalog_response(cpu_index, "CPU")
+
+
+@flask_app.route("/catalog_gpu", methods=["GET"])
+def catalog_gpu():
+    return catalog_response(gpu_index, "GPU")
+
+
+def search_components(component):
+    """
+    The labels a query may match: one component, or both if none is given.
+    Returns None for an unknown component.
+    """
+    if not component:
+        return list(name_indexes)
+    label = component.upper()
+    return [label] if label in ("CPU", "GPU") else None
+
+
+@flask_app.route("/search", methods=["GET"])
+def search():
+    """
+    Catalog parts matching a free-text query, best first.
+    """
+    query = request.args.get("q", "")
+    limit = max(1, min(request.args.get("limit", default=10, type=int), MAX_SEARCH_RESULTS))
+    labels = search_components(request.args.get("component"))
+    if not query.strip():
+        return jsonify({"error": "Missing 'q' query parameter"}), 400
+    if labels is None:
+        return jsonify({"error": "'component' must be 'cpu' or 'gpu'"}), 400
+    results = [
+        {"name": name, "component": label, "similarity": similarity}
+        for label in labels if label in name_indexes
+        for name, similarity in name_indexes[label].search(query, limit)
+    ]
+    if len(labels) > 1:
+        results.sort(key=lambda result: -result["similarity"])
+    return jsonify({"query": query, "results": results[:limit]})
+
+
+def estimate_part(label, name):
+    """
+    Estimated price of a catalog part: from the price table, or scored from
+    its catalog features while the table is being rebuilt.
+    """
+    loaded = registry.get(label)
+    price = loaded.prices.get(name) if loaded.prices is not None else None
+    metrics.PRICE_LOOKUPS.inc(model=label, result="miss" if price is None else "hit")
+    if price is None:
+        index = registry.indexes[label]
+        features = predict.features_from_frame(index.df.iloc[[index.row(name)]])
+        price = float(predict.predict_batch(loaded.model, features)[0])
+        metrics.PREDICTED_ROWS.inc(model=label, path="single")
+    return price, loaded.version
+
+
+@flask_app.route("/predict_by_name", methods=["GET", "POST"])
+def predict_by_name():
+    """
+    Resolves a free-text part name ("ryzen 7 5800x") to the closest catalog
+    part and returns its estimated price. Unresolved names get 404 with the
+    closest suggestions.
+    """
+    timer = g.timer
+    with timer.phase("parse"):
+        data = request.get_json(force=True, silent=True) if request.method == "POST" else request.args
+        if not hasattr(data, "get"):
+            data = {}
+        query = data.get("name")
+        component = data.get("component")
+    if not isinstance(query, str) or not query.strip():
+        return jsonify({"error": "'name' must be a non-empty string"}), 400
+    labels = search_components(component) if component is None or isinstance(component, str) else None
+    if labels is None:
+        return jsonify({"error": "'component' must be 'cpu' or 'gpu'"}), 400
+
+    with timer.phase("resolve"):
+        matches = [(*name_indexes[label].resolve(query), label) for label in labels if label in name_indexes]
+        name, similarity, label = max(matches, key=lambda match: (match[0] is not None, match[1]),
+                                      default=(None, 0.0, None))
+    if name is None:
+        suggestions = [
+            {"name": match, "component": label, "similarity": score}
+            for label in labels if label in name_indexes
+            for match, score in name_indexes[label].search(query, 3)
+        ]
+        suggestions.sort(key=lambda suggestion: -suggestion["similarity"])
+        return jsonify({"error": f"No part matches '{query}'", "suggestions": suggestions[:5]}), 404
+
+    try:
+        with timer.phase("predict"):
+            price, version = estimate_part(label, name)
+    except Exception as err:
+        print(f"[{label} ERROR] {err}")
+        return jsonify({"error": str(err)}), 500
+    with timer.phase("serialize"):
+        return jsonify({"query": query, "name": name, "component": label, "similarity": similarity,
+                        "estimated_price": price, "model_version": version})
+
+
+def build_optimizer(prices):
+    """
+    The optimizer over listed catalog prices, or over the estimates of the
+    models now serving, built on first use.
+    """
+    if prices == "listed":
+        key = ("listed",)
+        if key not in build_optimizers:
+            build_optimizers[key] = BuildOptimizer.from_frames(cpu_index.df, gpu_index.df)
+        return build_optimizers[key]
+    cpu, gpu = registry.get("CPU"), registry.get("GPU")
+    if cpu.prices is None or gpu.prices is None:
+        return None
+    key = ("estimated", cpu.version, gpu.version)
+    if key not in build_optimizers:
+        for stale in [k for k in list(build_optimizers) if k[0] == "estimated"]:
+            build_optimizers.pop(stale, None)
+        build_optimizers[key] = BuildOptimizer.from_frames(cpu_index.df, gpu_index.df, cpu.prices, gpu.prices)
+    return build_optimizers[key]
+
+
+@flask_app.route("/best_builds", methods=["GET"])
+def best_builds():
+    """
+    The k CPU+GPU pairs with the highest combined PassMark score within a budget.
+    """
+    if cpu_index is None or gpu_index is None:
+        return jsonify({"error": "CPU and GPU catalogs are not loaded"}), 503
+    budget = request.args.get("budget", type=float)
+    k = request.args.get("k", default=5, type=int)
+    objective = request.args.get("objective", "raw")
+    cpu_weight = request.args.get("cpu_weight", default=0.5, type=float)
+    prices = request.args.get("prices", "listed")
+    if budget is None or not math.isfinite(budget) or budget <= 0:
+        return jsonify({"error": "'budget' must be a positive number"}), 400
+    if objective not in OBJECTIVES:
+        return jsonify({"error": f"'objective' must be one of: {', '.join(OBJECTIVES)}"}), 400
+    if cpu_weight is None or not math.isfinite(cpu_weight) or not 0 <= cpu_weight <= 1:
+        return jsonify({"error": "'cpu_weight' must be between 0 and 1"}), 400
+    if prices not in ("listed", "estimated"):
+        return jsonify({"error": "'prices' must be 'listed' or 'estimated'"}), 400
+
+    optimizer = build_optimizer(prices)
+    if optimizer is None:
+        return jsonify({"error": "Price tables are not loaded"}), 503
+    builds = optimizer.best(budget, max(1, min(k, MAX_BUILDS)), objective, cpu_weight)
+    body = {"budget": budget, "objective": objective, "prices": prices, "builds": optimizer.describe(builds)}
+    if prices == "estimated":
+        body["model_versions"] = {label: registry.get(label).version for label in ("CPU", "GPU")}
+    return jsonify(body)
+
+
+def run_flask(host="0.0.0.0", port=5050):
+    """
+    Runs the API on Flask's development server (used when embedded in Streamlit).
+    """
+    flask_app.run(host=host, port=port)
@@ -0,0 +1,157 @@
+import heapq
+import numpy as np
+
+# Largest number of builds one query may ask for; the part frontiers keep
+# every part that can appear in a top-MAX_BUILDS answer
+MAX_BUILDS = 50
+OBJECTIVES = ("raw", "weighted")
+
+
+def frontier(prices, scores, depth=MAX_BUILDS):
+    """
+    Positions (in price order) of the parts that fewer than `depth` other parts
+    dominate, i.e. cost no more and score at least as much. A dominated part
+    can be swapped for any of its dominators without breaking the budget or
+    lowering the objective, so it never ranks in the top `depth` builds.
+    With depth=1 this is the Pareto frontier of price vs score.
+    """
+    best = []  # min-heap of the `depth` highest scores among cheaper parts
+    keep = []
+    for pos, score in enumerate(scores.tolist()):
+        if len(best) < depth:
+            keep.append(pos)
+            heapq.heappush(best, score)
+        elif score > best[0]:
+            keep.append(pos)
+            heapq.heapreplace(best, score)
+    return np.asarray(keep, dtype=np.intp)
+
+
+class PartList:
+    """
+    One catalog reduced to what the optimizer needs: names, prices and scores
+    of its frontier parts, sorted by price. Repeated names keep their first
+    row and parts without a price or score are dropped.
+    """
+    def __init__(self, names, prices, scores, depth=MAX_BUILDS):
+        names = np.asarray(names, dtype=object)
+        prices = np.asarray(prices, dtype=float)
+        scores = np.asarray(scores, dtype=float)
+        _, first = np.unique(names, return_index=True)
+        first = first[~(np.isnan(prices[first]) | np.isnan(scores[first]))]
+        order = first[np.lexsort((first, prices[first]))]
+        self.catalog_size = len(order)
+
+        keep = order[frontier(prices[order], scores[order], depth)]
+        self.names = names[keep]
+        self.prices = prices[keep]
+        self.scores = scores[keep]
+        self.best_score = float(self.scores.max()) if len(keep) else 0.0
+
+    @classmethod
+    def from_frame(cls, df, name_col, prices=None, score_col="PassMark_Score"):
+        """
+        From a cleaned catalog. `prices` is a name -> price mapping (e.g. a
+        PriceTable of model estimates) to use instead of the listed Price.
+        """
+        names = df[name_col].to_numpy()
+        if prices is None:
+            part_prices = df["Price"].to_numpy(dtype=float)
+        else:
+            part_prices = np.array([prices.get(name) for name in names], dtype=float)
+        return cls(names, part_prices, df[score_col].to_numpy(dtype=float))
+
+    def __len__(self):
+        return len(self.names)
+
+    def describe(self, pos):
+        return {"name": self.names[pos], "PassMark_Score": float(self.scores[pos]),
+                "Price": round(float(self.prices[pos]), 2)}
+
+
+class BuildOptimizer:
+    """
+    Finds the CPU+GPU pairs with the highest combined score within a budget,
+    without the n*m cross join. Both catalogs are cut to their frontiers
+    (see frontier()) once, when built. A query then sweeps the CPUs from the
+    most to the least expensive while a pointer into the price-sorted GPUs
+    only moves forward, keeping the k best GPUs affordable at each step in a
+    small heap. A CPU whose best possible pair cannot beat the current k-th
+    build is skipped, so a query costs about O((n + m) log k) in practice.
+    """
+    def __init__(self, cpus, gpus):
+        self.cpus = cpus
+        self.gpus = gpus
+
+    @classmethod
+    def from_frames(cls, cpu_df, gpu_df, cpu_prices=None, gpu_prices=None):
+        return cls(PartList.from_frame(cpu_df, "CPU", cpu_prices), PartList.from_frame(gpu_df, "GPU", gpu_prices))
+
+    def weights(self, objective, cpu_weight):
+        """
+        Per-part objective terms. "raw" adds the two PassMark scores; "weighted"
+        scales each score by the best in its catalog, so cpu_weight (0 to 1)
+        trades CPU against GPU performance on a common scale.
+        """
+        if objective == "raw":
+            return self.cpus.scores, self.gpus.scores
+        if objective == "weighted":
+            return (cpu_weight * self.cpus.scores / (self.cpus.best_score or 1.0),
+                    (1 - cpu_weight) * self.gpus.scores / (self.gpus.best_score or 1.0))
+        raise ValueError(f"Unknown objective: {objective} (expected one of {', '.join(OBJECTIVES)})")
+
+    def best(self, budget, k=5, objective="raw", cpu_weight=0.5):
+        """
+        The top-k builds costing at most `budget`, best first (ties: cheaper first).
+        Each build is (objective value, total price, CPU position, GPU position).
+        """
+        cpu_value, gpu_value = self.weights(objective, cpu_weight)
+        k = max(0, min(int(k), MAX_BUILDS))
+        if k == 0 or not len(self.cpus) or not len(self.gpus):
+            return []
+        cpu_prices, gpu_prices = self.cpus.prices, self.gpus.prices
+        gpu_value = gpu_value.tolist()
+        # GPUs affordable alongside each CPU: a prefix of the price-sorted list
+        affordable = np.searchsorted(gpu_prices, budget - cpu_prices, side="right").tolist()
+
+        top = []          # min-heap of (value, -price, cpu, gpu): the k best builds so far
+        gpu_heap = []     # min-heap of (value, -gpu): the k best GPUs in the affordable prefix
+        ranked = []       # gpu_heap sorted best first, rebuilt when the prefix grows
+        ranked_size = 0
+        j = 0
+        for i in range(len(cpu_prices) - 1, -1, -1):
+            end = affordable[i]
+            if end == 0:
+                continue
+            while j < end:
+                entry = (gpu_value[j], -j)
+                if len(gpu_heap) < k:
+                    heapq.heappush(gpu_heap, entry)
+                elif entry > gpu_heap[0]:
+                    heapq.heapreplace(gpu_heap, entry)
+                j += 1
+            if ranked_size != j:
+                ranked = sorted(gpu_heap, reverse=True)
+                ranked_size = j
+
+            base = float(cpu_value[i])
+            price = cpu_prices[i]
+            for value, neg_gpu in ranked:
+                build = (base + value, -(price + gpu_prices[-neg_gpu]), i, -neg_gpu)
+                if len(top) < k:
+                    heapq.heappush(top, build)
+                elif build[:2] > top[0][:2]:
+                    heapq.heapreplace(top, build)
+                else:
+                    break  # the GPUs are ranked, so later pairs score no higher
+        return [(value, -neg_price, cpu, gpu) for value, neg_price, cpu, gpu in sorted(top, reverse=True)]
+
+    def describe(self, builds):
+        """
+        JSON-ready records for the builds returned by best().
+        """
+        return [
+            {"cpu": self.cpus.describe(cpu), "gpu": self.gpus.describe(gpu),
+             "total_price": round(float(total), 2), "objective": round(value, 6)}
+            for value, total, cpu, gpu in builds
+        ]
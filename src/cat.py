@@ -1,50 +1,271 @@
 import os
+import json
+import time
+import tempfile
 import numpy as np
+import pandas as pd
 from catboost import CatBoostRegressor, Pool
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
+import storage
 from preproc import preprocess_for_catboost
+from predict import FEATURES
+from pipeline import file_hash
+from oblivious import ObliviousTrees, export_path
 
 
-def train_catboost_model(X, y, cat_features, model_path, label="CPU"):
+# Used until tuning.py has saved tuned parameters next to the model
+DEFAULT_PARAMS = {"iterations": 300, "learning_rate": 0.05, "depth": 5}
+# Brand has a handful of values; one-hot splits (rather than CTRs) keep the
+# trees exportable to the NumPy evaluator in oblivious.py
+ONE_HOT_MAX_SIZE = 16
+# Held-out share of each catalog (see holdout_mask)
+TEST_SIZE = 0.2
+
+# Incremental retraining (see train_component): the largest share of added,
+# removed or changed parts for which training continues from the current
+# model, the trees each warm start adds, and how far a model may grow past
+# the size of its last full retrain before a full retrain is forced
+DRIFT_THRESHOLD = float(os.environ.get("INCREMENTAL_DRIFT_THRESHOLD", "0.05"))
+INCREMENTAL_ITERATIONS = int(os.environ.get("INCREMENTAL_ITERATIONS", "50"))
+MAX_TREE_GROWTH = 2.0
+
+
+def params_path(model_path):
     """
-    Trains a CatBoost model
+    Tuned parameters live next to the model: cpu_price_model_catboost.params.json
     """
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    return os.path.splitext(model_path)[0] + ".params.json"
 
-    train_pool = Pool(X_train, y_train, cat_features=cat_features)
-    test_pool = Pool(X_test, y_test, cat_features=cat_features)
 
+def load_params(model_path):
+    """
+    Tuned parameters saved by tuning.py for this model, or DEFAULT_PARAMS.
+    """
+    try:
+        with open(params_path(model_path)) as f:
+            return json.load(f)["params"]
+    except (OSError, ValueError, KeyError):
+        return dict(DEFAULT_PARAMS)
+
+
+def holdout_mask(names, test_size=TEST_SIZE):
+    """
+    Rows held out for evaluation, chosen by a stable hash of the part name.
+    A part stays on the same side of the split across scrapes, so a model
+    continued from an earlier one is never scored on rows it was trained on.
+    """
+    hashes = pd.util.hash_pandas_object(pd.Series(names, dtype=object), index=False).to_numpy()
+    return (hashes % 1000) < round(test_size * 1000)
+
+
+def fit_model(X_train, y_train, cat_features, params, thread_count=-1, init_model=None,
+              one_hot_max_size=ONE_HOT_MAX_SIZE):
+    """
+    Fits a CatBoost regressor, continuing from `init_model` (its trees are kept
+    and new ones fitted to the remaining error) when one is given.
+    one_hot_max_size=None leaves Brand to CatBoost's default encoding (CTRs).
+    """
+    encoding = {} if one_hot_max_size is None else {"one_hot_max_size": one_hot_max_size}
     model = CatBoostRegressor(
-        iterations=300,
-        learning_rate=0.05,
-        depth=5,
+        **params,
+        **encoding,
         loss_function='RMSE',
         verbose=0,
-        random_seed=42
+        random_seed=42,
+        thread_count=thread_count
     )
-    model.fit(train_pool)
+    model.fit(Pool(X_train, y_train, cat_features=cat_features), init_model=init_model)
+    return model
+
 
-    preds = np.expm1(model.predict(test_pool))
-    y_true = np.expm1(y_test)
+def holdout_rmse(model, X_test, y_test):
+    """
+    RMSE in dollars on held-out rows (y is the log1p target).
+    """
+    preds = np.expm1(model.predict(X_test))
+    return float(np.sqrt(mean_squared_error(np.expm1(y_test), preds)))
 
-    rmse = np.sqrt(mean_squared_error(y_true, preds))
-    print(f"[CatBoost] {label} Price RMSE: ${rmse:.2f}")
 
+def save_model(model, model_path, brands, label="CPU"):
+    """
+    Saves the model and its NumPy export. Returns the hash of the .cbm.
+    """
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
-    model.save_model(model_path, format="cbm")
+    # Write then rename, so a serving process watching model/ never reads a partial file
+    tmp_path = model_path + ".tmp"
+    model.save_model(tmp_path, format="cbm")
+    digest = file_hash(tmp_path)
+    # Exported before the rename, so the .npz is in place when the new .cbm appears
+    export_model(model, model_path, brands, digest, label)
+    os.replace(tmp_path, model_path)
     print(f"Saved {label} CatBoost model to {model_path}")
+    return digest
+
+
+def brand_hash_codes(model, spec, brands):
+    """
+    Maps the hashed Brand values in the model's one-hot splits to positions
+    in `brands`. CatBoost does not expose its category hash, so each brand is
+    probed: a row with that brand takes the "equal" side of a one-hot split
+    exactly when the split's value is the brand's hash.
+    """
+    probe = Pool(np.array([[0.0, 0.0, 0.0, b] for b in brands], dtype=object), cat_features=[3])
+    leaves = np.asarray(model.calc_leaf_indexes(probe))
+    code_of_hash = {}
+    for t, tree in enumerate(spec["oblivious_trees"]):
+        for k, split in enumerate(tree["splits"]):
+            if split["split_type"] == "OneHotFeature":
+                matches = np.flatnonzero((leaves[:, t] >> k) & 1)
+                if len(matches):
+                    code_of_hash[split["value"]] = int(matches[0])
+    return code_of_hash
+
+
+def export_model(model, model_path, brands, source_hash, label="CPU"):
+    """
+    Writes the model as flat NumPy arrays next to model_path (see oblivious.py),
+    tagged with the hash of the .cbm it came from. Returns the path, or None
+    if the model uses splits the NumPy evaluator cannot represent.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "model.json")
+        model.save_model(json_path, format="json")
+        with open(json_path) as f:
+            spec = json.load(f)
+    try:
+        trees = ObliviousTrees.from_catboost_json(spec, brand_hash_codes(model, spec, brands),
+                                                  brands, source_hash)
+    except ValueError as err:
+        print(f"[CatBoost] {label} model not exported: {err}")
+        return None
+    path = trees.save(export_path(model_path))
+    print(f"Exported {label} model ({len(trees.leaf_values)} trees) to {path}")
+    return path
+
+
+def snapshot_name(label):
+    """
+    Dataset holding the rows the current model was trained on: data/cpu_train_snapshot.parquet
+    """
+    return f"{label.lower()}_train_snapshot"
+
+
+def data_drift(previous, current, name_col):
+    """
+    Compares two catalogs part by part (matched on name; the first row of a
+    repeated name). Returns the parts added, removed and changed in any
+    feature or price, and their share of the previous catalog.
+    """
+    columns = FEATURES + ["Price"]
+    before = previous.drop_duplicates(name_col).set_index(name_col)[columns]
+    after = current.drop_duplicates(name_col).set_index(name_col)[columns]
+    common = after.index.intersection(before.index)
+    a = after.loc[common].astype(object)
+    b = before.loc[common].astype(object)
+    changed = ~((a == b) | (a.isna() & b.isna())).all(axis=1)
+    drift = {
+        "added": int(len(after.index.difference(before.index))),
+        "removed": int(len(before.index.difference(after.index))),
+        "changed": int(changed.sum()),
+    }
+    drift["fraction"] = round(sum(drift.values()) / max(len(before), 1), 6)
+    return drift
+
+
+def warm_start_model(project_root, name, model_path, df, name_col, threshold, params):
+    """
+    The current model to continue from, or None and the reason for a full retrain.
+    """
+    if not os.path.exists(model_path) or not storage.exists(project_root, name):
+        return None, None, {}, "no previous model or training snapshot"
+    meta = storage.load_metadata(project_root, name)
+    if meta.get("model_hash") != file_hash(model_path):
+        return None, None, meta, "the model file is not the one the snapshot was trained for"
+    if meta.get("params") != params:
+        return None, None, meta, "the training parameters changed"
+    drift = data_drift(storage.load_frame(project_root, name), df, name_col)
+    if drift["fraction"] > threshold:
+        return None, drift, meta, f"drift {drift['fraction']:.1%} is above {threshold:.1%}"
+    previous = CatBoostRegressor()
+    previous.load_model(model_path)
+    if previous.tree_count_ + INCREMENTAL_ITERATIONS > MAX_TREE_GROWTH * meta.get("base_trees", previous.tree_count_):
+        return None, drift, meta, f"the model has grown to {previous.tree_count_} trees"
+    return previous, drift, meta, None
+
+
+def train_component(df, project_root, label, thread_count=-1, incremental=False,
+                    threshold=DRIFT_THRESHOLD, compare=False):
+    """
+    Trains one component's model on its cleaned catalog and saves a snapshot
+    of the training rows next to it. Evaluation always uses the name-hashed
+    holdout, so RMSEs are comparable between runs.
+
+    With incremental=True the catalog is diffed against the snapshot. If the
+    drifted share of parts is at most `threshold`, training continues from
+    the current .cbm (CatBoost init_model): INCREMENTAL_ITERATIONS new trees
+    are fitted on the full training split on top of the existing ones.
+    Otherwise the model is retrained from scratch. compare=True also runs a
+    full retrain after a warm start (not saved) to report both paths.
+    Returns a summary with the path taken, its time and holdout RMSE.
+    """
+    name_col = label
+    model_path = os.path.join(project_root, "model", f"{label.lower()}_price_model_catboost.cbm")
+    name = snapshot_name(label)
+    X, y, cat_features = preprocess_for_catboost(df)
+    holdout = holdout_mask(df[name_col])
+    X_train, y_train, X_test, y_test = X[~holdout], y[~holdout], X[holdout], y[holdout]
+    params = load_params(model_path)
+
+    previous, drift, meta, reason = None, None, {}, "incremental training is off"
+    if incremental:
+        previous, drift, meta, reason = warm_start_model(project_root, name, model_path, df, name_col,
+                                                         threshold, params)
+    summary = {"label": label, "drift": drift}
+
+    start = time.perf_counter()
+    if previous is not None:
+        print(f"[CatBoost] {label} warm start: drift {drift['fraction']:.1%} ({drift['added']} added, "
+              f"{drift['changed']} changed, {drift['removed']} removed), "
+              f"adding {INCREMENTAL_ITERATIONS} trees to {previous.tree_count_}")
+        model = fit_model(X_train, y_train, cat_features, {**params, "iterations": INCREMENTAL_ITERATIONS},
+                          thread_count, init_model=previous)
+        summary.update(mode="incremental", base_trees=meta.get("base_trees", previous.tree_count_),
+                       previous_rmse=round(holdout_rmse(previous, X_test, y_test), 4))
+    else:
+        print(f"[CatBoost] {label} full retrain ({reason}), params: {params}")
+        model = fit_model(X_train, y_train, cat_features, params, thread_count)
+        summary.update(mode="full", base_trees=model.tree_count_)
+    summary.update(seconds=round(time.perf_counter() - start, 3), trees=model.tree_count_,
+                   holdout_rmse=round(holdout_rmse(model, X_test, y_test), 4), holdout_rows=int(holdout.sum()))
+
+    line = f"[CatBoost] {label} {summary['mode']}: {summary['seconds']:.2f}s, holdout RMSE ${summary['holdout_rmse']:.2f}"
+    if "previous_rmse" in summary:
+        line += f" (previous model ${summary['previous_rmse']:.2f})"
+    print(line)
+
+    if compare and summary["mode"] == "incremental":
+        start = time.perf_counter()
+        full = fit_model(X_train, y_train, cat_features, params, thread_count)
+        summary["full"] = {"seconds": round(time.perf_counter() - start, 3),
+                           "holdout_rmse": round(holdout_rmse(full, X_test, y_test), 4)}
+        print(f"[CatBoost] {label} full retrain for comparison: {summary['full']['seconds']:.2f}s, "
+              f"holdout RMSE ${summary['full']['holdout_rmse']:.2f}")
+
+    digest = save_model(model, model_path, sorted(X["Brand"].unique()), label)
+    storage.save_frame(df[[name_col] + FEATURES + ["Price"]], project_root, name, csv=False, metadata={
+        "model_hash": digest,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": params,
+        **{k: v for k, v in summary.items() if k != "label"},
+    })
+    return summary
 
 
-def catboost_train_cpu(cpu_df, project_root):
-    X, y, cat_features = preprocess_for_catboost(cpu_df)
-    model_path = os.path.join(project_root, "model", "cpu_price_model_catboost.cbm")
-    train_catboost_model(X, y, cat_features, model_path, label="CPU")
+def catboost_train_cpu(cpu_df, project_root, thread_count=-1, incremental=False, threshold=DRIFT_THRESHOLD,
+                       compare=False):
+    return train_component(cpu_df, project_root, "CPU", thread_count, incremental, threshold, compare)
 
 
-def catboost_train_gpu(gpu_df, project_root):
-    X, y, cat_features = preprocess_for_catboost(gpu_df)
-    model_path = os.path.join(project_root, "model", "gpu_price_model_catboost.cbm")
-    train_catboost_model(X, y, cat_features, model_path, label="GPU")
+def catboost_train_gpu(gpu_df, project_root, thread_count=-1, incremental=False, threshold=DRIFT_THRESHOLD,
+                       compare=False):
+    return train_component(gpu_df, project_root, "GPU", thread_count, incremental, threshold, compare)
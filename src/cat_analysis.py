@@ -1,131 +1,258 @@
-import pandas as pd
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
 from catboost import CatBoostRegressor
-import scipy.stats as stats
-import matplotlib.pyplot as plt
-import os
+import cat
+import predict
+import storage
+import pricetable
+from eda import pyplot, downsample
+from pipeline import file_hash
+
+LABELS = ("CPU", "GPU")
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def report_path(project_root):
+    return os.path.join(project_root, "model", "diagnostics.json")
+
+
+def load_models(project_root, labels=LABELS):
+    """
+    The trained CatBoost models, with the version hash of each file.
+    """
+    models, versions = {}, {}
+    for label in labels:
+        path = pricetable.model_path(project_root, label)
+        models[label] = CatBoostRegressor()
+        models[label].load_model(path)
+        versions[label] = file_hash(path)[:12]
+    return models, versions
+
+
+def residual_stats(actual, predicted):
+    """
+    Error summary of one set of predictions in dollars: RMSE, MAE, bias,
+    MAPE, R^2 and quantiles of the residuals (actual - predicted).
+    """
+    residual = actual - predicted
+    abs_error = np.abs(residual)
+    squared = residual * residual
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_error = np.where(actual > 0, abs_error / actual, np.nan)
+    total = np.sum((actual - actual.mean()) ** 2)
+    return {
+        "count": int(len(actual)),
+        "rmse": round(float(np.sqrt(squared.mean())), 4),
+        "mae": round(float(abs_error.mean()), 4),
+        "bias": round(float(residual.mean()), 4),
+        "mape": round(float(np.nanmean(pct_error)), 4),
+        "r2": round(float(1 - squared.sum() / total), 4) if total > 0 else None,
+        "residual_quantiles": {str(q): round(float(v), 4) for q, v in zip(QUANTILES, np.quantile(residual, QUANTILES))},
+        "abs_error_quantiles": {str(q): round(float(v), 4) for q, v in zip(QUANTILES, np.quantile(abs_error, QUANTILES))},
+    }
+
+
+def brand_stats(actual, predicted, brands):
+    """
+    Per-brand count, RMSE, MAE, bias and residual quantiles, from one grouped pass.
+    """
+    residual = actual - predicted
+    frame = pd.DataFrame({"brand": brands, "residual": residual,
+                          "abs_error": np.abs(residual), "squared": residual * residual})
+    groups = frame.groupby("brand", sort=True)
+    summary = groups.agg(count=("residual", "size"), bias=("residual", "mean"),
+                         mae=("abs_error", "mean"), mse=("squared", "mean"))
+    quantiles = groups["residual"].quantile(list(QUANTILES)).unstack()
+    return {
+        str(brand): {
+            "count": int(row["count"]),
+            "rmse": round(float(np.sqrt(row["mse"])), 4),
+            "mae": round(float(row["mae"]), 4),
+            "bias": round(float(row["bias"]), 4),
+            "residual_quantiles": {str(q): round(float(quantiles.at[brand, q]), 4) for q in QUANTILES},
+        }
+        for brand, row in summary.iterrows()
+    }
+
+
+def diagnose(df, model, name_col):
+    """
+    Scores a cleaned catalog in one batched call and returns the arrays the
+    report and plots are built from.
+    """
+    features = predict.features_from_frame(df)
+    actual = df["Price"].to_numpy(dtype=float)
+    predicted = predict.predict_batch(model, features).astype(float)
+    return {
+        "actual": actual,
+        "predicted": predicted,
+        "residual": actual - predicted,
+        "brand": features["Brand"].to_numpy(),
+        "holdout": cat.holdout_mask(df[name_col]),
+    }
+
+
+# ---- plots: each takes (data, label, path, **options) and renders on Agg ----
+
+def plot_actual_vs_pred(data, label, path, max_points=None):
+    plt, _ = pyplot()
+    df = downsample(pd.DataFrame({"actual": data["actual"], "predicted": data["predicted"]}), max_points)
+    lo, hi = data["actual"].min(), data["actual"].max()
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ax.scatter(df["actual"], df["predicted"], alpha=0.6)
+    ax.plot([lo, hi], [lo, hi], "r--")
+    ax.set_xlabel("Actual Price")
+    ax.set_ylabel("Predicted Price")
+    ax.set_title(f"{label}: Actual vs Predicted")
+    ax.grid(True)
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_residual_vs_pred(data, label, path, max_points=None):
+    plt, _ = pyplot()
+    df = downsample(pd.DataFrame({"predicted": data["predicted"], "residual": data["residual"]}), max_points)
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ax.scatter(df["predicted"], df["residual"], alpha=0.5)
+    ax.axhline(0, color="red", linestyle="--")
+    ax.set_xlabel("Predicted Price")
+    ax.set_ylabel("Residual (Actual - Predicted)")
+    ax.set_title(f"{label}: Residuals vs Predicted")
+    ax.grid(True)
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_qq(data, label, path):
+    import scipy.stats as stats
+    plt, _ = pyplot()
+    fig, ax = plt.subplots(figsize=(6, 5))
+    stats.probplot(data["residual"], dist="norm", plot=ax)
+    ax.set_title(f"QQ Plot of {label} Residuals")
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_importance(data, label, path, color="skyblue"):
+    plt, _ = pyplot()
+    fig, ax = plt.subplots(figsize=(6, 3))
+    ax.barh(list(data["importance"]), list(data["importance"].values()), color=color)
+    ax.set_xlabel("Importance Score")
+    ax.set_title(f"{label} Feature Importance")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def plot_residual_by_brand(data, label, path):
+    plt, _ = pyplot()
+    brands = sorted(set(data["brand"]))
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.boxplot([data["residual"][data["brand"] == b] for b in brands], showfliers=False)
+    ax.set_xticks(range(1, len(brands) + 1))
+    ax.set_xticklabels(brands)
+    ax.axhline(0, color="red", linestyle="--")
+    ax.set_ylabel("Residual (Actual - Predicted)")
+    ax.set_title(f"{label}: Residuals by Brand")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def render(fn, data, label, path, options):
+    fn(data, label, path, **options)
+    return os.path.basename(path)
+
+
+def plot_jobs(results, plot_dir, max_scatter_points=None):
+    """
+    (fn, data, label, path, options) for each figure. Workers only receive
+    the arrays their figure reads.
+    """
+    colors = {"CPU": "skyblue", "GPU": "salmon"}
+    scatter = {"max_points": max_scatter_points}
+    jobs = []
+    for label, data in results.items():
+        prefix = os.path.join(plot_dir, label.lower())
+        jobs += [
+            (plot_actual_vs_pred, {k: data[k] for k in ("actual", "predicted")}, label,
+             f"{prefix}_actual_vs_pred.png", scatter),
+            (plot_residual_vs_pred, {k: data[k] for k in ("predicted", "residual")}, label,
+             f"{prefix}_Residual_vs_pred.png", scatter),
+            (plot_qq, {"residual": data["residual"]}, label, f"{prefix}_QQ.png", {}),
+            (plot_importance, {"importance": data["importance"]}, label,
+             f"{prefix}_importance.png", {"color": colors.get(label, "skyblue")}),
+            (plot_residual_by_brand, {k: data[k] for k in ("residual", "brand")}, label,
+             f"{prefix}_residual_by_brand.png", {}),
+        ]
+    return jobs
+
+
+def run_diagnostics(project_root, frames, models, versions=None, workers=1, max_scatter_points=None):
+    """
+    Model diagnostics for already-loaded cleaned catalogs and models
+    ({"CPU": ..., "GPU": ...}). Writes model/diagnostics.json with residual
+    statistics over the whole catalog, the rows held out in training and
+    per brand, then renders the plots to plots/cat_analysis, serially or
+    across `workers` processes. Returns the report.
+    """
+    plot_dir = os.path.join(project_root, "plots", "cat_analysis")
+    os.makedirs(plot_dir, exist_ok=True)
+
+    results, report = {}, {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "models": {}}
+    for label, model in models.items():
+        data = results[label] = diagnose(frames[label], model, label)
+        data["importance"] = dict(zip(predict.FEATURES, map(float, model.get_feature_importance())))
+        holdout = data["holdout"]
+        report["models"][label] = {
+            "model_version": (versions or {}).get(label),
+            "all": residual_stats(data["actual"], data["predicted"]),
+            "holdout": residual_stats(data["actual"][holdout], data["predicted"][holdout]),
+            "by_brand": brand_stats(data["actual"], data["predicted"], data["brand"]),
+            "feature_importance": {k: round(v, 4) for k, v in data["importance"].items()},
+        }
+        summary = report["models"][label]["holdout"]
+        print(f"[Diagnostics] {label} holdout RMSE ${summary['rmse']:.2f}, MAE ${summary['mae']:.2f}, "
+              f"bias ${summary['bias']:.2f} over {summary['count']} rows")
+
+    path = report_path(project_root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved diagnostics report to {path}")
+
+    jobs = plot_jobs(results, plot_dir, max_scatter_points)
+    if workers <= 1:
+        for job in jobs:
+            render(*job)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            for future in [pool.submit(render, *job) for job in jobs]:
+                future.result()
+    print(f"Rendered {len(jobs)} diagnostic plots to {plot_dir}")
+    return report
+
+
+def gen_cat_analysis_plots(project_root, workers=1, max_scatter_points=None):
+    """
+    Standalone entry point: loads the cleaned catalogs and trained models from project_root.
+    """
+    frames = {label: storage.load_frame(project_root, f"{label.lower()}_clean") for label in LABELS}
+    models, versions = load_models(project_root)
+    return run_diagnostics(project_root, frames, models, versions, workers, max_scatter_points)
 
-# Create output directory
-def gen_cat_analysis_plots(project_root):
-    output_dir = os.path.join(project_root, "plots/cat_analysis")
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Load data
-    cpu_df = pd.read_csv("../data/cpu_clean.csv")
-    gpu_df = pd.read_csv("../data/gpu_clean.csv")
-
-    # Load models
-    cpu_model = CatBoostRegressor()
-    gpu_model = CatBoostRegressor()
-    cpu_model.load_model("../model/cpu_price_model_catboost.cbm")
-    gpu_model.load_model("../model/gpu_price_model_catboost.cbm")
-
-    # Prepare features
-    cpu_features = cpu_df[["PassMark_Score", "ValueScore", "Rank", "Brand"]].copy()
-    gpu_features = gpu_df[["PassMark_Score", "ValueScore", "Rank", "Brand"]].copy()
-
-    # True prices
-    cpu_true = cpu_df["Price"]
-    gpu_true = gpu_df["Price"]
-
-    for df in [cpu_features, gpu_features]:
-        for col in df.select_dtypes(include=["object"]):
-            df[col] = df[col].fillna("Unknown").astype(str)
-
-
-    # Predict
-    cpu_pred_log = cpu_model.predict(cpu_features)
-    gpu_pred_log = gpu_model.predict(gpu_features)
-
-    cpu_pred = np.expm1(cpu_pred_log)
-    gpu_pred = np.expm1(gpu_pred_log)
-
-    # Residuals
-    cpu_residuals = cpu_true - cpu_pred
-    gpu_residuals = gpu_true - gpu_pred
-
-
-    # Actual vs predicted
-    plt.scatter(cpu_true, cpu_pred, alpha=0.6)
-    plt.plot([cpu_true.min(), cpu_true.max()], [cpu_true.min(), cpu_true.max()], 'r--')
-    plt.xlabel("Actual Price")
-    plt.ylabel("Predicted Price")
-    plt.title("CPU: Actual vs Predicted")
-    plt.grid(True)
-    plt.savefig(os.path.join(output_dir, "cpu_actual_vs_pred.png"))
-    plt.show()
-
-    plt.scatter(gpu_true, gpu_pred, alpha=0.6)
-    plt.plot([gpu_true.min(), gpu_true.max()], [gpu_true.min(), gpu_true.max()], 'r--')
-    plt.xlabel("Actual Price")
-    plt.ylabel("Predicted Price")
-    plt.title("GPU: Actual vs Predicted")
-    plt.grid(True)
-    plt.savefig(os.path.join(output_dir, "gpu_actual_vs_pred.png"))
-    plt.show()
-
-
-
-    # Residuals vs Predicted
-    plt.scatter(cpu_pred, cpu_residuals, alpha=0.5)
-    plt.axhline(0, color='red', linestyle='--')
-    plt.xlabel("Predicted Price")
-    plt.ylabel("Residual (Actual - Predicted)")
-    plt.title("CPU: Residuals vs Predicted")
-    plt.grid(True)
-    plt.savefig(os.path.join(output_dir, "cpu_Residual_vs_pred.png"))
-    plt.show()
-
-
-    plt.scatter(gpu_pred, gpu_residuals, alpha=0.5)
-    plt.axhline(0, color='red', linestyle='--')
-    plt.xlabel("Predicted Price")
-    plt.ylabel("Residual (Actual - Predicted)")
-    plt.title("GPU: Residuals vs Predicted")
-    plt.grid(True)
-    plt.savefig(os.path.join(output_dir, "gpu_Residual_vs_pred.png"))
-    plt.show()
-
-
-    # QQ Plot
-    stats.probplot(cpu_residuals, dist="norm", plot=plt)
-    plt.title("QQ Plot of CPU Residuals")
-    plt.savefig(os.path.join(output_dir, "cpu_QQ.png"))
-    plt.show()
-
-    stats.probplot(gpu_residuals, dist="norm", plot=plt)
-    plt.title("QQ Plot of GPU Residuals")
-    plt.savefig(os.path.join(output_dir, "gpu_QQ.png"))
-    plt.show()
-
-
-    # Get importance and feature names
-    importances_cpu = cpu_model.get_feature_importance()
-    feature_names = cpu_features.columns
-
-    # Plot
-    plt.figure(figsize=(6, 3))
-    plt.barh(feature_names, importances_cpu, color='skyblue')
-    plt.xlabel("Importance Score")
-    plt.title("CPU Feature Importance")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "cpu_importance.png"))
-    plt.show()
-
-
-    importances_gpu = gpu_model.get_feature_importance()
-    feature_names_gpu = gpu_features.columns
-
-    plt.figure(figsize=(6, 3))
-    plt.barh(feature_names_gpu, importances_gpu, color='salmon')
-    plt.xlabel("Importance Score")
-    plt.title("GPU Feature Importance")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "gpu_importance.png"))
-    plt.show()
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Residual report and diagnostic plots of the trained models.")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to render the plots")
+    parser.add_argument("--max-scatter-points", type=int, default=None)
+    args = parser.parse_args()
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     print("====== Generating Analysis Plots ======")
-    gen_cat_analysis_plots(project_root)
-    print("====== Complete ======")
\ No newline at end of file
+    gen_cat_analysis_plots(project_root, args.workers, args.max_scatter_points)
+    print("====== Complete ======")
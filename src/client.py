@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import predict
+
+# Seconds the UI waits for each call to a remote API (API_TIMEOUT is the
+# server's worker timeout, see serve.py)
+UI_API_TIMEOUT = float(os.environ.get("UI_API_TIMEOUT", "3"))
+
+
+class LocalClient:
+    """
+    Prices the selected parts with the API's models in this process, for the
+    embedded setup: no HTTP round trip or JSON encoding. Catalog parts come
+    from each model's precomputed price table; a part missing from it (e.g.
+    while a table is rebuilt) is scored from its catalog features.
+    """
+    def __init__(self, registry, indexes):
+        self.registry = registry
+        self.indexes = indexes
+
+    def estimate(self, names):
+        """
+        Takes {"CPU": name, "GPU": name} and returns, per label, either
+        {"estimated_price", "model_version"} or {"error"}.
+        """
+        self.registry.ensure_watcher()
+        results = {}
+        for label, name in names.items():
+            loaded = self.registry.get(label)
+            price = loaded.prices.get(name) if loaded.prices is not None else None
+            if price is None:
+                index = self.indexes.get(label)
+                row = index.row(name) if index is not None else None
+                if row is None:
+                    results[label] = {"error": f"Unknown {label}: {name}"}
+                    continue
+                features = predict.features_from_frame(index.df.iloc[[row]])
+                price = float(predict.predict_batch(loaded.model, features)[0])
+            results[label] = {"estimated_price": price, "model_version": loaded.version}
+        return results
+
+
+class RemoteClient:
+    """
+    Prices the selected parts through a separately running API (API_URL).
+    Requests for all parts go out at once on a shared session, so they reuse
+    pooled keep-alive connections.
+    """
+    def __init__(self, base_url, timeout=UI_API_TIMEOUT, max_workers=4):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def post(self, label, name):
+        import requests
+
+        try:
+            response = self.session.post(f"{self.base_url}/predict_{label.lower()}",
+                                         json={"name": name}, timeout=self.timeout)
+        except requests.RequestException as err:
+            print(f"[CLIENT ERROR] {label}: {err}")
+            return {"error": f"{label} request failed: {err}"}
+        if response.status_code != 200:
+            return {"error": f"{label} API error {response.status_code}"}
+        body = response.json()
+        return {"estimated_price": body["estimated_price"], "model_version": body.get("model_version")}
+
+    def catalog(self, label):
+        """
+        The API's catalog of one component as a DataFrame of name, PassMark
+        score and listed price, so the UI needs no local copy of data/.
+        """
+        import pandas as pd
+
+        response = self.session.get(f"{self.base_url}/catalog_{label.lower()}", timeout=self.timeout)
+        response.raise_for_status()
+        return pd.DataFrame(response.json())
+
+    def estimate(self, names):
+        """
+        Same contract as LocalClient.estimate; the requests run concurrently.
+        """
+        futures = {label: self.executor.submit(self.post, label, name) for label, name in names.items()}
+        return {label: future.result() for label, future in futures.items()}
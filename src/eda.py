@@ -1,9 +1,27 @@
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import json
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
+
+FINGERPRINT_FILE = ".fingerprints.json"
+
+
+@lru_cache(maxsize=None)
+def pyplot():
+    """
+    Imports and themes matplotlib and seaborn on first use, so a pass whose plots are
+    all unchanged never loads them. Returns (pyplot, seaborn).
+    """
+    import matplotlib
+    matplotlib.use("Agg")  # headless: never open a display, safe in worker processes
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_theme(style="whitegrid")
+    return plt, sns
 
-sns.set_theme(style="whitegrid")
 
 def ensure_plot_dir(project_root, label):
     plot_dir = os.path.join(project_root, "plots", label)
@@ -11,93 +29,178 @@ def ensure_plot_dir(project_root, label):
     return plot_dir
 
 
-def plot_score_and_price_distributions(cpu_df, gpu_df, plot_dir, label_prefix):
-    """
-    Distributions of PassMark scores and prices.
-    """
-    for label, df in [("CPU", cpu_df), ("GPU", gpu_df)]:
-        # Score Distribution
-        plt.figure(figsize=(8, 4))
-        sns.histplot(df["PassMark_Score"], bins=50, kde=True)
-        plt.title(f"{label} Score Distribution")
-        plt.xlabel("PassMark Score")
-        plt.ylabel("Count")
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_score_dist.png"))
-        plt.close()
-
-        # Price Distribution
-        plt.figure(figsize=(8, 4))
-        sns.histplot(df["Price"], bins=40, kde=True)
-        plt.title(f"{label} Price Distribution")
-        plt.xlabel("Price (USD)")
-        plt.ylabel("Count")
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_price_dist.png"))
-        plt.close()
-
-        # Boxplot
-        plt.figure(figsize=(6, 3))
-        sns.boxplot(x=df["Price"])
-        plt.title(f"{label} Price Boxplot")
-        plt.xlabel("Price (USD)")
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_price_boxplot.png"))
-        plt.close()
-
-
-def plot_price_vs_performance(cpu_df, gpu_df, plot_dir, label_prefix):
+def downsample(df, max_points):
     """
-    Price vs performance scatter plots, linear and log-scale.
+    Deterministic random sample of at most max_points rows (None keeps every row).
     """
-    for label, df in [("CPU", cpu_df), ("GPU", gpu_df)]:
-        plt.figure(figsize=(8, 5))
-        sns.scatterplot(data=df, x="PassMark_Score", y="Price")
-        plt.title(f"{label}: Price vs. Performance")
-        plt.xlabel("PassMark Score")
-        plt.ylabel("Price (USD)")
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_price_vs_score.png"))
-        plt.close()
-
-        # Log Price
-        plt.figure(figsize=(8, 5))
-        sns.scatterplot(data=df, x="PassMark_Score", y=np.log1p(df["Price"]))
-        plt.title(f"{label}: Log Price vs. Performance")
-        plt.xlabel("PassMark Score")
-        plt.ylabel("Log(Price + 1)")
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_logprice_vs_score.png"))
-        plt.close()
-
-
-def plot_price_performance_ratio(cpu_df, gpu_df, plot_dir, label_prefix, top_n=20):
+    if max_points is None or len(df) <= max_points:
+        return df
+    return df.sample(n=max_points, random_state=0)
+
+
+def plot_score_dist(df, label, path):
+    plt, sns = pyplot()
+    plt.figure(figsize=(8, 4))
+    sns.histplot(df["PassMark_Score"], bins=50, kde=True)
+    plt.title(f"{label} Score Distribution")
+    plt.xlabel("PassMark Score")
+    plt.ylabel("Count")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_price_dist(df, label, path):
+    plt, sns = pyplot()
+    plt.figure(figsize=(8, 4))
+    sns.histplot(df["Price"], bins=40, kde=True)
+    plt.title(f"{label} Price Distribution")
+    plt.xlabel("Price (USD)")
+    plt.ylabel("Count")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_price_boxplot(df, label, path):
+    plt, sns = pyplot()
+    plt.figure(figsize=(6, 3))
+    sns.boxplot(x=df["Price"])
+    plt.title(f"{label} Price Boxplot")
+    plt.xlabel("Price (USD)")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_price_vs_score(df, label, path, max_points=None):
+    plt, sns = pyplot()
+    df = downsample(df, max_points)
+    plt.figure(figsize=(8, 5))
+    sns.scatterplot(data=df, x="PassMark_Score", y="Price")
+    plt.title(f"{label}: Price vs. Performance")
+    plt.xlabel("PassMark Score")
+    plt.ylabel("Price (USD)")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_logprice_vs_score(df, label, path, max_points=None):
+    plt, sns = pyplot()
+    df = downsample(df, max_points)
+    plt.figure(figsize=(8, 5))
+    sns.scatterplot(data=df, x="PassMark_Score", y=np.log1p(df["Price"]))
+    plt.title(f"{label}: Log Price vs. Performance")
+    plt.xlabel("PassMark Score")
+    plt.ylabel("Log(Price + 1)")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_price_per_score(df, label, path, name_col, top_n=20):
     """
-    Bar plots of price-to-performance ratio (inverse of ValueScore).
+    Bar plot of the best price-to-performance ratios (inverse of ValueScore).
     """
-    for label, df, name_col in [("CPU", cpu_df, "CPU"), ("GPU", gpu_df, "GPU")]:
-        df = df.copy()
-        df["PricePerScore"] = df["Price"] / df["PassMark_Score"]
-        top = df.sort_values("PricePerScore").head(top_n)
-
-        plt.figure(figsize=(10, 6))
-        sns.barplot(x="PricePerScore", y=name_col, data=top, hue=name_col, palette="viridis", legend=False)
+    plt, sns = pyplot()
+    df = df.copy()
+    df["PricePerScore"] = df["Price"] / df["PassMark_Score"]
+    top = df.sort_values("PricePerScore").head(top_n)
 
-        plt.title(f"Top {top_n} {label}s with Best Price-to-Performance")
-        plt.xlabel("Price / Score")
-        plt.ylabel(label)
-        plt.tight_layout()
-        plt.savefig(os.path.join(plot_dir, f"{label_prefix.lower()}_{label}_price_per_score.png"))
-        plt.close()
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x="PricePerScore", y=name_col, data=top, hue=name_col, palette="viridis", legend=False)
 
+    plt.title(f"Top {top_n} {label}s with Best Price-to-Performance")
+    plt.xlabel("Price / Score")
+    plt.ylabel(label)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
 
 
-def run_full_eda(cpu_df, gpu_df, project_root, label="clean"):
+class PlotJob:
+    """
+    One EDA figure: the render function, the columns it reads and its options.
+    The fingerprint covers exactly that input, so a plot is only redrawn when
+    its own data or options change.
+    """
+    def __init__(self, filename, fn, df, label, columns, **options):
+        self.filename = filename
+        self.fn = fn
+        self.df = df[columns]
+        self.label = label
+        self.options = options
+
+    def fingerprint(self):
+        digest = hashlib.sha256()
+        digest.update(self.fn.__name__.encode())
+        digest.update(json.dumps(self.options, sort_keys=True).encode())
+        digest.update(",".join(map(str, self.df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(self.df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def render(self, plot_dir):
+        self.fn(self.df, self.label, os.path.join(plot_dir, self.filename), **self.options)
+        return self.filename
+
+
+def build_plot_jobs(cpu_df, gpu_df, label_prefix, max_scatter_points=None):
+    """
+    Lists every EDA figure for both components.
+    """
+    prefix = label_prefix.lower()
+    scatter = {"max_points": max_scatter_points}
+    jobs = []
+    for label, df in [("CPU", cpu_df), ("GPU", gpu_df)]:
+        jobs += [
+            PlotJob(f"{prefix}_{label}_score_dist.png", plot_score_dist, df, label, ["PassMark_Score"]),
+            PlotJob(f"{prefix}_{label}_price_dist.png", plot_price_dist, df, label, ["Price"]),
+            PlotJob(f"{prefix}_{label}_price_boxplot.png", plot_price_boxplot, df, label, ["Price"]),
+            PlotJob(f"{prefix}_{label}_price_vs_score.png", plot_price_vs_score, df, label,
+                    ["PassMark_Score", "Price"], **scatter),
+            PlotJob(f"{prefix}_{label}_logprice_vs_score.png", plot_logprice_vs_score, df, label,
+                    ["PassMark_Score", "Price"], **scatter),
+            PlotJob(f"{prefix}_{label}_price_per_score.png", plot_price_per_score, df, label,
+                    [label, "PassMark_Score", "Price"], name_col=label),
+        ]
+    return jobs
+
+
+def load_fingerprints(plot_dir):
+    try:
+        with open(os.path.join(plot_dir, FINGERPRINT_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def run_full_eda(cpu_df, gpu_df, project_root, label="clean", workers=1, max_scatter_points=None):
     """
     Runs all EDA visualizations and saves plots under a labeled subfolder.
+    Plots whose input fingerprint matches the last render and whose file still
+    exists are skipped; the rest render serially or across `workers` processes.
+    Set max_scatter_points to downsample the scatter plots of large catalogs.
     """
     plot_dir = ensure_plot_dir(project_root, label)
-    plot_score_and_price_distributions(cpu_df, gpu_df, plot_dir, label)
-    plot_price_vs_performance(cpu_df, gpu_df, plot_dir, label)
-    plot_price_performance_ratio(cpu_df, gpu_df, plot_dir, label)
-
+    previous = load_fingerprints(plot_dir)
+
+    fingerprints = {}
+    todo = []
+    for job in build_plot_jobs(cpu_df, gpu_df, label, max_scatter_points):
+        fingerprints[job.filename] = job.fingerprint()
+        unchanged = previous.get(job.filename) == fingerprints[job.filename]
+        if not (unchanged and os.path.exists(os.path.join(plot_dir, job.filename))):
+            todo.append(job)
+
+    if workers <= 1 or len(todo) <= 1:
+        for job in todo:
+            job.render(plot_dir)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            for future in [pool.submit(job.render, plot_dir) for job in todo]:
+                future.result()
+
+    with open(os.path.join(plot_dir, FINGERPRINT_FILE), "w") as f:
+        json.dump(fingerprints, f, indent=2)
+    print(f"EDA '{label}': rendered {len(todo)} plots, {len(fingerprints) - len(todo)} unchanged")
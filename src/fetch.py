@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+# Avoid bot detection
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+}
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchResult:
+    """
+    Outcome of fetching one URL. `text` holds the page body, taken from the
+    local cache when the server answered 304 Not Modified.
+    """
+    def __init__(self, url, status, text, not_modified=False):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.not_modified = not_modified
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host by at least `min_interval` seconds
+    (plus a little random jitter). Different hosts do not wait on each other.
+    """
+    def __init__(self, min_interval=1.5, jitter=1.0):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval + random.uniform(0, self.jitter)
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ConditionalCache:
+    """
+    On-disk store of page bodies with their ETag / Last-Modified validators,
+    used to send conditional requests and serve 304 responses.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".html")
+
+    def validators(self, url):
+        """
+        Returns the conditional request headers for a cached URL.
+        """
+        entry = self.index.get(url)
+        if not entry or not os.path.exists(self._body_path(url)):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load(self, url):
+        with open(self._body_path(url), encoding="utf-8") as f:
+            return f.read()
+
+    def store(self, url, response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with open(self._body_path(url), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        with self._lock:
+            self.index[url] = {"etag": etag, "last_modified": last_modified}
+            with open(self.index_path, "w") as f:
+                json.dump(self.index, f, indent=2)
+
+
+class Fetcher:
+    """
+    Concurrent page fetcher: one pooled keep-alive session, per-host rate
+    limiting, retries with exponential backoff and conditional requests.
+    """
+    def __init__(self, cache_dir=None, max_workers=4, pool_size=8, min_interval=1.5,
+                 jitter=1.0, retries=3, backoff=1.0, timeout=10, headers=HEADERS):
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.cache = ConditionalCache(cache_dir) if cache_dir else None
+        self.limiter = HostRateLimiter(min_interval, jitter)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt)
+
+    def fetch(self, url):
+        """
+        Fetches one URL. Returns a FetchResult, or None if every attempt failed.
+        """
+        host = urlsplit(url).netloc
+        conditional = self.cache.validators(url) if self.cache else {}
+
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(host)
+            response = None
+            try:
+                response = self.session.get(url, headers=conditional, timeout=self.timeout)
+                if response.status_code == 304 and conditional:
+                    return FetchResult(url, 304, self.cache.load(url), not_modified=True)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    if self.cache:
+                        self.cache.store(url, response)
+                    return FetchResult(url, response.status_code, response.text)
+                error = f"HTTP {response.status_code}"
+            except requests.HTTPError as e:
+                print(f"Failed to fetch {url}: {e}")
+                return None
+            except requests.RequestException as e:
+                error = e
+
+            if attempt < self.retries:
+                time.sleep(self._retry_delay(attempt, response))
+
+        print(f"Failed to fetch {url} after {self.retries + 1} attempts: {error}")
+        return None
+
+    def fetch_all(self, urls):
+        """
+        Fetches many URLs concurrently. Results are returned in input order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self.fetch, urls))
+
+    def close(self):
+        self.session.close()
@@ -1,28 +1,175 @@
-import scraper as scraper
-import preproc
-import eda
 import os
-import cat
+import time
+import argparse
+from pipeline import Stage, Pipeline, print_timings, write_timing_metrics
+
+# Stage modules (pandas, catboost, matplotlib, ...) are imported inside the
+# stage functions, so --list and runs that skip stages start quickly.
+
+RAW_DATA = [os.path.join("data", "cpu_passmark.parquet"), os.path.join("data", "gpu_passmark.parquet")]
+CPU_CLEAN = os.path.join("data", "cpu_clean.parquet")
+GPU_CLEAN = os.path.join("data", "gpu_clean.parquet")
+CPU_MODEL = os.path.join("model", "cpu_price_model_catboost.cbm")
+GPU_MODEL = os.path.join("model", "gpu_price_model_catboost.cbm")
+# Flat NumPy exports of the models, written by cat.py for the numpy serving backend
+CPU_EXPORT = os.path.join("model", "cpu_price_model_catboost.npz")
+GPU_EXPORT = os.path.join("model", "gpu_price_model_catboost.npz")
+# Written by tuning.py; a missing file hashes as "missing", so tuning retriggers training
+CPU_PARAMS = os.path.join("model", "cpu_price_model_catboost.params.json")
+GPU_PARAMS = os.path.join("model", "gpu_price_model_catboost.params.json")
+# Rows each model was trained on, diffed by incremental retraining (see cat.train_component)
+CPU_SNAPSHOT = os.path.join("data", "cpu_train_snapshot.parquet")
+GPU_SNAPSHOT = os.path.join("data", "gpu_train_snapshot.parquet")
+CPU_PRICE_TABLE = os.path.join("data", "cpu_price_table.parquet")
+GPU_PRICE_TABLE = os.path.join("data", "gpu_price_table.parquet")
+DIAGNOSTICS = [os.path.join("model", "diagnostics.json"), os.path.join("plots", "cat_analysis")]
+
+
+def run_scrape(project_root):
+    import scraper
+    scraper.scrape_all(project_root)
+
+
+def run_eda_preclean(project_root, workers=1, max_scatter_points=None):
+    import preproc
+    import eda
+    cpu_df, gpu_df = preproc.load_data(project_root)
+    eda.run_full_eda(cpu_df, gpu_df, project_root, label="preclean",
+                     workers=workers, max_scatter_points=max_scatter_points)
+
+
+def run_clean(project_root):
+    import preproc
+    cpu_df, gpu_df = preproc.load_data(project_root)
+    print("Raw Data has been loaded")
+    preproc.clean_data(cpu_df, gpu_df, project_root)
+
+
+def run_eda_postclean(project_root, workers=1, max_scatter_points=None):
+    import storage
+    import eda
+    cpu_df = storage.load_frame(project_root, "cpu_clean")
+    gpu_df = storage.load_frame(project_root, "gpu_clean")
+    eda.run_full_eda(cpu_df, gpu_df, project_root, label="postclean",
+                     workers=workers, max_scatter_points=max_scatter_points)
+
+
+def run_train_cpu(project_root, thread_count=-1, **incremental):
+    import storage
+    import cat
+    cat.catboost_train_cpu(storage.load_frame(project_root, "cpu_clean"), project_root, thread_count, **incremental)
+
+
+def run_train_gpu(project_root, thread_count=-1, **incremental):
+    import storage
+    import cat
+    cat.catboost_train_gpu(storage.load_frame(project_root, "gpu_clean"), project_root, thread_count, **incremental)
+
+
+def run_price_table_cpu(project_root):
+    import pricetable
+    pricetable.save_price_table(project_root, "CPU", "CPU")
+
+
+def run_price_table_gpu(project_root):
+    import pricetable
+    pricetable.save_price_table(project_root, "GPU", "GPU")
+
+
+def run_diagnostics(project_root, workers=1, max_scatter_points=None):
+    import cat_analysis
+    cat_analysis.gen_cat_analysis_plots(project_root, workers=workers, max_scatter_points=max_scatter_points)
+
+
+def build_stages(cores=None, jobs=1, plot_workers=1, max_scatter_points=None, incremental=None):
+    """
+    The pipeline DAG, in execution order. When stages run concurrently
+    (jobs > 1), the core budget is split between the two training branches
+    so CatBoost does not oversubscribe the host. `incremental` holds the
+    keyword arguments of cat.train_component's incremental mode, if enabled.
+    """
+    cores = cores or os.cpu_count() or 1
+    train_threads = max(1, cores // min(jobs, 2))
+    eda_workers = max(1, min(plot_workers, cores))
+    eda = dict(cores=eda_workers,
+               kwargs={"workers": eda_workers, "max_scatter_points": max_scatter_points})
+    train = dict(cores=train_threads, kwargs={"thread_count": train_threads, **(incremental or {})})
+    return [
+        Stage("scrape", run_scrape, outputs=RAW_DATA, always=True),
+        Stage("eda_preclean", run_eda_preclean, inputs=RAW_DATA,
+              outputs=[os.path.join("plots", "preclean")], deps=["scrape"], **eda),
+        Stage("clean", run_clean, inputs=RAW_DATA, outputs=[CPU_CLEAN, GPU_CLEAN], deps=["scrape"]),
+        Stage("eda_postclean", run_eda_postclean, inputs=[CPU_CLEAN, GPU_CLEAN],
+              outputs=[os.path.join("plots", "postclean")], deps=["clean"], **eda),
+        Stage("train_cpu", run_train_cpu, inputs=[CPU_CLEAN, CPU_PARAMS],
+              outputs=[CPU_MODEL, CPU_EXPORT, CPU_SNAPSHOT], deps=["clean"], **train),
+        Stage("train_gpu", run_train_gpu, inputs=[GPU_CLEAN, GPU_PARAMS],
+              outputs=[GPU_MODEL, GPU_EXPORT, GPU_SNAPSHOT], deps=["clean"], **train),
+        Stage("price_table_cpu", run_price_table_cpu, inputs=[CPU_CLEAN, CPU_MODEL],
+              outputs=[CPU_PRICE_TABLE], deps=["train_cpu"]),
+        Stage("price_table_gpu", run_price_table_gpu, inputs=[GPU_CLEAN, GPU_MODEL],
+              outputs=[GPU_PRICE_TABLE], deps=["train_gpu"]),
+        Stage("diagnostics", run_diagnostics, inputs=[CPU_CLEAN, GPU_CLEAN, CPU_MODEL, GPU_MODEL],
+              outputs=DIAGNOSTICS, deps=["train_cpu", "train_gpu"], **eda),
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape, clean, explore and train the price models.")
+    parser.add_argument("--only", nargs="+", metavar="STAGE",
+                        help="Run only these stages (a prefix such as 'train' selects train_cpu and train_gpu)")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="Rerun these stages even if their inputs are unchanged (no names: all stages)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Stages to run concurrently in a process pool (default 1: sequential)")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1,
+                        help="Total cores shared by concurrently running stages")
+    parser.add_argument("--plot-workers", type=int, default=1,
+                        help="Processes used to render each EDA pass")
+    parser.add_argument("--max-scatter-points", type=int, default=None,
+                        help="Downsample EDA scatter plots to at most this many points")
+    parser.add_argument("--incremental", action="store_true",
+                        default=os.environ.get("INCREMENTAL_TRAINING") == "1",
+                        help="Continue training from the current models when few parts changed")
+    parser.add_argument("--drift-threshold", type=float, default=None,
+                        help="Largest share of changed parts trained incrementally (default 0.05)")
+    parser.add_argument("--compare-full", action="store_true",
+                        help="After an incremental fit, also time a full retrain and report both RMSEs")
+    parser.add_argument("--timing-log", default=os.environ.get("PIPELINE_TIMING_LOG"),
+                        help="JSON-lines file for stage timings (default data/pipeline_timings.jsonl, '-' for stdout)")
+    parser.add_argument("--metrics-file", default=os.environ.get("PIPELINE_METRICS_FILE"),
+                        help="Also write the stage timings in the Prometheus text format to this file")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
+    args = parse_args()
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     os.makedirs(os.path.join(project_root, "data"), exist_ok=True)
     os.makedirs(os.path.join(project_root, "model"), exist_ok=True)
-    print("====== Scraping Data ======")
-    scraper.scrape_passmark_cpu(project_root)
-    scraper.scrape_passmark_gpu(project_root)
-
-    print("====== Loading Raw Data ======")
-    cpu_df, gpu_df = preproc.load_data(project_root)
-    print("Raw Data has been loaded")
-    eda.run_full_eda(cpu_df, gpu_df, project_root, label="preclean")
 
-    print("====== Cleaning Raw Data ======")
-    cpu_df_clean, gpu_df_clean = preproc.clean_data(cpu_df, gpu_df, project_root)
-    eda.run_full_eda(cpu_df_clean, gpu_df_clean, project_root, label="postclean")
+    incremental = None
+    if args.incremental:
+        incremental = {"incremental": True, "compare": args.compare_full}
+        if args.drift_threshold is not None:
+            incremental["threshold"] = args.drift_threshold
+    stages = build_stages(args.cores, args.jobs, args.plot_workers, args.max_scatter_points, incremental)
+    pipeline = Pipeline(project_root, stages, timing_log=args.timing_log)
+    try:
+        pipeline.check_selectors((args.only or []) + (args.force or []))
+    except ValueError as err:
+        raise SystemExit(err)
 
-    print("====== Training CPU model ======")
-    cat.catboost_train_cpu(cpu_df_clean, project_root)
-    print("====== Training GPU model ======")
-    cat.catboost_train_gpu(gpu_df_clean, project_root)
+    if args.list:
+        for stage in pipeline.stages:
+            print(f"{stage.name:<16} after: {', '.join(stage.deps) or '-'}")
+    else:
+        start = time.perf_counter()
+        timings = pipeline.run(only=args.only, force=args.force, jobs=args.jobs, cores=args.cores)
+        wall = time.perf_counter() - start
+        print_timings(timings, wall=wall)
+        pipeline.log(event="run", seconds=round(sum(t[2] for t in timings), 3), wall=round(wall, 3),
+                     ran=[name for name, status, _ in timings if status == "ran"], jobs=args.jobs)
+        if args.metrics_file:
+            print(f"Wrote stage metrics to {write_timing_metrics(args.metrics_file, timings, wall)}")
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_BUCKETS = (1, 10, 100, 1000, 10000)
+MODEL_LOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    One metric family with a fixed set of label names, rendered in the
+    Prometheus text exposition format. Values are per process: under gunicorn
+    each worker keeps and serves its own.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def label_values(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Yields (suffix, label values, extra labels, value) for every series.
+        """
+        with self.lock:
+            items = list(self.values.items())
+        for values, value in items:
+            yield "", values, (), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(self.labelnames, values, extra)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def remove(self, **labels):
+        with self.lock:
+            self.values.pop(self.label_values(labels), None)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self.label_values(labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * len(self.buckets), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            items = [(values, list(counts), total) for values, (counts, total) in self.values.items()]
+        for values, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", values, (("le", format_value(float(bound))),), cumulative
+            yield "_sum", values, (), total
+            yield "_count", values, (), cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    A metric whose values are read when rendered, from counters kept
+    elsewhere (e.g. PredictionCache). `fn` returns {label values tuple: value}.
+    """
+    def __init__(self, name, help_text, labelnames, fn, kind="gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        for values, value in self.fn().items():
+            yield "", tuple(map(str, values)), (), value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Serving metrics, exposed by the API's GET /metrics
+REGISTRY = MetricsRegistry()
+REQUESTS = REGISTRY.counter("pcv_requests_total", "HTTP requests by endpoint and status code.",
+                            ["endpoint", "status"])
+REQUEST_SECONDS = REGISTRY.histogram("pcv_request_seconds", "Request latency by endpoint.", ["endpoint"])
+PHASE_SECONDS = REGISTRY.histogram("pcv_request_phase_seconds",
+                                   "Request latency by endpoint and phase (parse, resolve, featurize, predict, serialize).",
+                                   ["endpoint", "phase"])
+BATCH_ROWS = REGISTRY.histogram("pcv_batch_rows", "Rows per batch prediction request.", ["model"],
+                                buckets=BATCH_BUCKETS)
+PREDICTED_ROWS = REGISTRY.counter("pcv_predicted_rows_total", "Rows scored by the model or served from cache.",
+                                  ["model", "path"])
+PRICE_LOOKUPS = REGISTRY.counter("pcv_price_table_lookups_total",
+                                 "Requests by part name answered from the price table.", ["model", "result"])
+MODEL_LOAD_SECONDS = REGISTRY.histogram("pcv_model_load_seconds",
+                                        "Time to read, warm and price a model file.", ["model"],
+                                        buckets=MODEL_LOAD_BUCKETS)
+MODEL_INFO = REGISTRY.gauge("pcv_model_info", "The model version being served (always 1).",
+                            ["model", "version", "backend"])
+
+
+class PhaseTimer:
+    """
+    Times the phases of one request. Each phase is observed in PHASE_SECONDS
+    and kept in `phases` for the JSON timing log.
+    """
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            PHASE_SECONDS.observe(elapsed, endpoint=self.endpoint, phase=name)
+
+
+def log_event(path, event):
+    """
+    Appends one event as a JSON line to a timing log (stdout if path is "-").
+    """
+    line = json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **event})
+    if path == "-":
+        print(line, flush=True)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(line + "\n")
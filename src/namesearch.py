@@ -0,0 +1,164 @@
+import re
+from bisect import bisect_left
+import numpy as np
+
+# Trigram similarity below which a query is not resolved to a part
+MIN_SIMILARITY = 0.4
+# Candidates are the names holding the query's rarest trigrams, added rarest
+# first until about this many are collected; only those are scored
+MAX_CANDIDATES = 1000
+
+
+def normalize(name):
+    """
+    Lowercase letter and digit runs separated by single spaces, so spelling,
+    punctuation and spacing variants meet: "GeForce RTX 3080", "rtx3080" and
+    "RTX-3080" all contain "rtx 3080".
+    """
+    return " ".join(re.findall(r"[a-z]+|[0-9]+", str(name).lower()))
+
+
+def trigrams(text):
+    """
+    Character trigrams of each token of a normalized name, padded so
+    prefixes and whole short tokens count ("7" -> "  7", " 7 ").
+    """
+    grams = set()
+    for token in text.split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """
+    Resolves free-text part names against one catalog, built once when the
+    cleaned data loads. Keeps an exact map of normalized names, the sorted
+    normalized names for prefix search, and a trigram inverted index
+    (trigram -> sorted name ids) for fuzzy matches. A query only scores the
+    names that share one of its rarest trigrams (about MAX_CANDIDATES), so
+    its cost barely grows with the catalog.
+    """
+    def __init__(self, names):
+        self.names = []
+        self.exact = {}
+        for name in names:
+            key = normalize(name)
+            if key and key not in self.exact:
+                self.exact[key] = len(self.names)
+                self.names.append(name)
+
+        keys = list(self.exact)
+        postings = {}
+        self.sizes = np.empty(len(keys), dtype=np.int32)
+        for i, key in enumerate(keys):
+            grams = trigrams(key)
+            self.sizes[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        # Trigrams of tokens that always occur together (e.g. a series name)
+        # share one posting array, which dice() then checks once
+        arrays = {}
+        self.postings = {}
+        for gram, ids in postings.items():
+            ids = np.asarray(ids, dtype=np.int32)
+            self.postings[gram] = arrays.setdefault(ids.tobytes(), ids)
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.sorted_keys = [keys[i] for i in order]
+        self.sorted_ids = order
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix(self, query, limit=10):
+        """
+        Ids of names that start with the normalized query, alphabetically.
+        """
+        key = normalize(query)
+        ids = []
+        pos = bisect_left(self.sorted_keys, key)
+        while pos < len(self.sorted_keys) and len(ids) < limit and self.sorted_keys[pos].startswith(key):
+            ids.append(self.sorted_ids[pos])
+            pos += 1
+        return ids
+
+    def dice(self, grams, query_size, ids):
+        """
+        Dice coefficient between the query's trigrams and those of each name id.
+        """
+        weights = {}
+        for gram in grams:
+            posting = self.postings[gram]
+            weights[id(posting)] = (posting, weights.get(id(posting), (posting, 0))[1] + 1)
+        shared = np.zeros(len(ids), dtype=np.int32)
+        for posting, weight in weights.values():
+            pos = np.searchsorted(posting, ids).clip(max=len(posting) - 1)
+            shared += weight * (posting[pos] == ids)
+        return 2 * shared / (query_size + self.sizes[ids])
+
+    def similar(self, key, limit=10):
+        """
+        (ids, similarities) of the names closest to a normalized query by the
+        Dice coefficient of their trigram sets, best first.
+        """
+        query = trigrams(key)
+        grams = sorted((gram for gram in query if gram in self.postings), key=lambda gram: len(self.postings[gram]))
+        if not grams:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        sources, total = 1, len(self.postings[grams[0]])
+        while sources < len(grams) and total + len(self.postings[grams[sources]]) <= MAX_CANDIDATES:
+            total += len(self.postings[grams[sources]])
+            sources += 1
+        candidates = np.unique(np.concatenate([self.postings[gram] for gram in grams[:sources]]))
+        similarity = self.dice(grams, len(query), candidates)
+
+        if len(candidates) > limit:
+            top = np.argpartition(-similarity, limit)[:limit]
+            candidates, similarity = candidates[top], similarity[top]
+        order = np.lexsort((candidates, -similarity))
+        return candidates[order], similarity[order]
+
+    def search(self, query, limit=10):
+        """
+        Up to `limit` (name, similarity) matches, best first: an exact match
+        of the normalized name, then names it is a prefix of, then the
+        closest names by trigram similarity (skipped when the prefix matches
+        already fill `limit`).
+        """
+        key = normalize(query)
+        if not key or limit <= 0:
+            return []
+        query_grams = trigrams(key)
+        grams = [gram for gram in query_grams if gram in self.postings]
+        ranked = []
+        if key in self.exact:
+            ranked.append((self.exact[key], 1.0))
+        prefixed = np.asarray(self.prefix(key, limit), dtype=np.int32)
+        if len(prefixed):
+            ranked += zip(prefixed.tolist(), self.dice(grams, len(query_grams), prefixed).tolist())
+        # Typeahead queries are usually answered by the prefix matches alone
+        if len(set(i for i, _ in ranked)) < limit:
+            ids, similarity = self.similar(key, limit)
+            ranked += zip(ids.tolist(), similarity.tolist())
+
+        results, seen = [], set()
+        for i, score in ranked:
+            if i not in seen:
+                seen.add(i)
+                results.append((self.names[i], round(float(score), 4)))
+        return results[:limit]
+
+    def resolve(self, query, min_similarity=MIN_SIMILARITY):
+        """
+        The catalog name a query most likely means, with its similarity,
+        or (None, best similarity) if nothing is close enough.
+        """
+        key = normalize(query)
+        if key in self.exact:
+            return self.names[self.exact[key]], 1.0
+        matches = self.search(query, 1)
+        if not matches:
+            return None, 0.0
+        name, score = matches[0]
+        return (name, score) if score >= min_similarity else (None, score)
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class PriceIndex:
+    """
+    Lookup structures over one cleaned catalog, built once when data loads:
+    a name -> row hash index and the rows sorted by price. nearest() finds
+    the k parts closest in price with a bisect plus a local scan,
+    O(log n + k), instead of a full-frame scan per request.
+    """
+    def __init__(self, df, name_col, price_col="Price", score_col="PassMark_Score"):
+        self.df = df
+        self.name_col = name_col
+        self.price_col = price_col
+        self.score_col = score_col
+
+        names = df[name_col].to_numpy()
+        prices = df[price_col].to_numpy(dtype=float)
+
+        # First row of every name, matching df[df[name_col] == name].iloc[0]
+        self.row_of = {}
+        for row, name in enumerate(names):
+            self.row_of.setdefault(name, row)
+
+        valid = np.flatnonzero(~np.isnan(prices))
+        order = valid[np.argsort(prices[valid], kind="stable")]
+        self.sorted_rows = order
+        self.sorted_prices = prices[order]
+        self.sorted_names = names[order]
+
+    def __contains__(self, name):
+        return name in self.row_of
+
+    def row(self, name):
+        """
+        Positional row of a part name, or None if it is unknown.
+        """
+        return self.row_of.get(name)
+
+    def nearest(self, name, k=4):
+        """
+        Positional rows of the k other parts closest in price to `name`,
+        closest first. Ties are broken by catalog order, like DataFrame.nsmallest.
+        """
+        row = self.row(name)
+        if row is None:
+            raise KeyError(name)
+        price = float(self.df[self.price_col].iat[row])
+        if np.isnan(price) or k <= 0:
+            return []
+
+        # Walk outwards from the price's insertion point, collecting k candidates
+        # per side, then extend each side over any run of equal boundary prices.
+        pos = int(np.searchsorted(self.sorted_prices, price, side="left"))
+        candidates = []
+        for step, start in ((-1, pos - 1), (1, pos)):
+            i, taken, boundary = start, 0, None
+            while 0 <= i < len(self.sorted_prices):
+                if taken >= k and self.sorted_prices[i] != boundary:
+                    break
+                if self.sorted_names[i] != name:
+                    candidates.append((abs(self.sorted_prices[i] - price), int(self.sorted_rows[i])))
+                    taken += 1
+                    boundary = self.sorted_prices[i]
+                i += step
+
+        candidates.sort()
+        return [row for _, row in candidates[:k]]
+
+    def describe(self, rows):
+        """
+        Name, score and price records for positional rows, for API responses.
+        """
+        subset = self.df.iloc[rows]
+        return [
+            {"name": n, self.score_col: float(s), self.price_col: round(float(p), 2)}
+            for n, s, p in zip(subset[self.name_col], subset[self.score_col], subset[self.price_col])
+        ]
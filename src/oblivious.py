@@ -0,0 +1,128 @@
+import os
+import numpy as np
+
+# Numeric feature columns, in the order of predict.NUMERIC_FEATURES; Brand is
+# appended as an integer code column after them
+NUMERIC_FEATURES = ["PassMark_Score", "ValueScore", "Rank"]
+BRAND_COLUMN = len(NUMERIC_FEATURES)
+# Rows evaluated at once; small chunks keep the (depth x trees x rows)
+# split buffers in cache
+CHUNK_ROWS = 256
+
+
+def export_path(model_path):
+    """
+    The flat export lives next to the model: cpu_price_model_catboost.npz
+    """
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+class ObliviousTrees:
+    """
+    A CatBoost regressor flattened into NumPy arrays, evaluated without catboost.
+
+    Every tree is oblivious: all nodes at depth d test the same split, so a
+    row's leaf index is the bit pattern of its depth-wise split outcomes.
+    Split k of tree t reads column split_feature[t, k] and tests
+    `value > split_border[t, k]` (numeric features, in float32 like CatBoost)
+    or `brand code == split_border[t, k]` (one-hot Brand splits). Shallower
+    trees are padded with splits that are never true.
+    """
+    def __init__(self, split_feature, split_border, split_onehot, leaf_values, scale, bias,
+                 brands, source_hash=""):
+        self.split_feature = np.asarray(split_feature, dtype=np.int32)
+        self.split_border = np.asarray(split_border, dtype=np.float32)
+        self.split_onehot = np.asarray(split_onehot, dtype=bool)
+        self.leaf_values = np.asarray(leaf_values, dtype=np.float64)
+        self.scale = float(scale)
+        self.bias = float(bias)
+        self.brands = [str(b) for b in brands]
+        self.brand_code = {b: i for i, b in enumerate(self.brands)}
+        self.source_hash = str(source_hash)
+
+        # Depth-major layouts used by predict_arrays
+        depth = self.split_feature.shape[1]
+        self._feature = np.ascontiguousarray(self.split_feature.T)
+        self._border = np.ascontiguousarray(self.split_border.T)[..., None]
+        self._onehot = np.ascontiguousarray(self.split_onehot.T)[..., None]
+        self._bit_weights = (np.intp(1) << np.arange(depth, dtype=np.intp))[:, None, None]
+        self._flat_leaves = self.leaf_values.ravel()
+        self._tree_offsets = (np.arange(len(self.leaf_values), dtype=np.intp) << depth)[:, None]
+
+    @classmethod
+    def from_catboost_json(cls, spec, code_of_hash, brands, source_hash=""):
+        """
+        Builds the arrays from a model saved with save_model(format="json").
+        `code_of_hash` maps the hashed Brand values in one-hot splits to
+        positions in `brands`. Raises ValueError for split types the
+        evaluator does not support (e.g. CTRs on high-cardinality categoricals).
+        """
+        trees = spec["oblivious_trees"]
+        depth = max(len(tree["splits"]) for tree in trees)
+        column_of = {f["feature_index"]: NUMERIC_FEATURES.index(f["feature_id"])
+                     for f in spec["features_info"]["float_features"]}
+
+        split_feature = np.zeros((len(trees), depth), dtype=np.int32)
+        split_border = np.full((len(trees), depth), np.inf, dtype=np.float32)
+        split_onehot = np.zeros((len(trees), depth), dtype=bool)
+        leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+        for t, tree in enumerate(trees):
+            for k, split in enumerate(tree["splits"]):
+                if split["split_type"] == "FloatFeature":
+                    split_feature[t, k] = column_of[split["float_feature_index"]]
+                    split_border[t, k] = split["border"]
+                elif split["split_type"] == "OneHotFeature":
+                    split_feature[t, k] = BRAND_COLUMN
+                    # A value no known brand hashes to can never match
+                    split_border[t, k] = code_of_hash.get(split["value"], -2)
+                    split_onehot[t, k] = True
+                else:
+                    raise ValueError(f"Unsupported split type {split['split_type']}")
+            leaf_values[t, :len(tree["leaf_values"])] = tree["leaf_values"]
+
+        scale, biases = spec["scale_and_bias"]
+        return cls(split_feature, split_border, split_onehot, leaf_values, scale, biases[0],
+                   brands, source_hash)
+
+    def save(self, path):
+        """
+        Writes the arrays as .npz, via a temporary file and rename.
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, split_feature=self.split_feature, split_border=self.split_border,
+                 split_onehot=self.split_onehot, leaf_values=self.leaf_values,
+                 scale_bias=np.array([self.scale, self.bias]), brands=np.array(self.brands, dtype=str),
+                 source_hash=np.array(self.source_hash))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            scale, bias = data["scale_bias"]
+            return cls(data["split_feature"], data["split_border"], data["split_onehot"],
+                       data["leaf_values"], scale, bias, data["brands"].tolist(),
+                       data["source_hash"].item())
+
+    def brand_codes(self, brands):
+        return np.array([self.brand_code.get(b, -1) for b in brands], dtype=np.float32)
+
+    def predict_arrays(self, num, brands):
+        """
+        Raw predictions (log price, like CatBoostRegressor.predict) for an
+        (n, 3) array of numeric features and a sequence of n Brand strings.
+        Leaf values are gathered tree-major and summed over the tree axis,
+        i.e. accumulated tree by tree in model order, which reproduces
+        CatBoost's results exactly (checked by benchmarks/bench_inference.py).
+        """
+        features = np.empty((BRAND_COLUMN + 1, len(brands)), dtype=np.float32)
+        features[:BRAND_COLUMN] = np.asarray(num, dtype=np.float32).T
+        features[BRAND_COLUMN] = self.brand_codes(brands)
+
+        out = np.empty(len(brands), dtype=np.float64)
+        for start in range(0, len(brands), CHUNK_ROWS):
+            values = features[:, start:start + CHUNK_ROWS][self._feature]  # depth x trees x rows
+            bits = np.where(self._onehot, values == self._border, values > self._border)
+            leaves = self._tree_offsets + (bits * self._bit_weights).sum(axis=0)
+            out[start:start + CHUNK_ROWS] = self._flat_leaves[leaves].sum(axis=0)
+        return self.bias + self.scale * out
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import metrics
+
+
+class Stage:
+    """
+    One step of the pipeline. `fn(project_root)` runs the step; `inputs` and
+    `outputs` are paths relative to the project root. A stage is skipped when
+    the content hash of its inputs matches the last successful run and all of
+    its outputs still exist. Stages with `always=True` (e.g. scraping) run on
+    every invocation.
+
+    `cores` is how many cores the stage may use; the parallel scheduler never
+    runs stages whose combined cores exceed the budget. `kwargs` are passed to
+    `fn` (e.g. CatBoost thread_count or the number of plot workers).
+    """
+    def __init__(self, name, fn, inputs=(), outputs=(), deps=(), always=False, cores=1, kwargs=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.always = always
+        self.cores = cores
+        self.kwargs = kwargs or {}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's contents, or None if it does not exist.
+    """
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def execute(fn, project_root, kwargs):
+    """
+    Runs a stage function (in a worker process in parallel mode) and returns its duration.
+    """
+    start = time.perf_counter()
+    fn(project_root, **kwargs)
+    return time.perf_counter() - start
+
+
+def matches(name, selectors):
+    """
+    True if a stage name is selected, either exactly or by prefix ("train" -> "train_cpu").
+    """
+    return any(name == sel or name.startswith(sel + "_") for sel in selectors)
+
+
+class Pipeline:
+    """
+    Runs stages in declaration order (which must respect `deps`), skipping
+    those whose hashed inputs are unchanged. State is kept in data/.pipeline_state.json;
+    every stage outcome is appended as a JSON line to `timing_log`
+    (default data/pipeline_timings.jsonl), tagged with the run's id.
+    """
+    def __init__(self, project_root, stages, timing_log=None):
+        self.project_root = project_root
+        self.stages = stages
+        self.timing_log = timing_log or os.path.join(project_root, "data", "pipeline_timings.jsonl")
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.state_path = os.path.join(project_root, "data", ".pipeline_state.json")
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def log(self, **event):
+        metrics.log_event(self.timing_log, {"run_id": self.run_id, **event})
+
+    def _path(self, rel):
+        return os.path.join(self.project_root, rel)
+
+    def inputs_hash(self, stage):
+        digest = hashlib.sha256()
+        for rel in stage.inputs:
+            digest.update(rel.encode())
+            digest.update((file_hash(self._path(rel)) or "missing").encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, inputs_hash):
+        if stage.always or not stage.outputs:
+            return False
+        if self.state.get(stage.name, {}).get("inputs_hash") != inputs_hash:
+            return False
+        return all(os.path.exists(self._path(rel)) for rel in stage.outputs)
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+
+    def check_selectors(self, selectors):
+        """
+        Raises ValueError if a selector matches no stage.
+        """
+        unknown = [sel for sel in selectors or [] if not any(matches(s.name, [sel]) for s in self.stages)]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+
+    def selected(self, only=None):
+        self.check_selectors(only)
+        return [s for s in self.stages if not only or matches(s.name, only)]
+
+    def needs_run(self, stage, force=False):
+        """
+        Returns (run?, inputs hash) for a stage, printing a note when it is skipped.
+        """
+        inputs_hash = self.inputs_hash(stage)
+        if not force and self.is_fresh(stage, inputs_hash):
+            print(f"[{stage.name}] skipped (inputs unchanged)")
+            self.log(event="stage", stage=stage.name, status="skipped", seconds=0.0)
+            return False, inputs_hash
+        return True, inputs_hash
+
+    def record(self, stage, inputs_hash, elapsed):
+        self.state[stage.name] = {
+            "inputs_hash": inputs_hash,
+            "outputs": {rel: file_hash(self._path(rel)) for rel in stage.outputs},
+            "seconds": round(elapsed, 3),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.save_state()
+        self.log(event="stage", stage=stage.name, status="ran", seconds=round(elapsed, 3), cores=stage.cores)
+        print(f"[{stage.name}] done in {elapsed:.2f}s")
+
+    def run_stage(self, stage, force=False):
+        """
+        Runs one stage in this process unless it is fresh. Returns (status, seconds).
+        """
+        run, inputs_hash = self.needs_run(stage, force)
+        if not run:
+            return "skipped", 0.0
+
+        print(f"====== {stage.name} ======")
+        elapsed = execute(stage.fn, self.project_root, stage.kwargs)
+        self.record(stage, inputs_hash, elapsed)
+        return "ran", elapsed
+
+    def run(self, only=None, force=None, jobs=1, cores=None):
+        """
+        Runs the selected stages. `force` is a list of stage selectors to rerun
+        regardless of their hashes; an empty list forces every stage.
+        With jobs > 1, independent stages run concurrently in a process pool
+        (see run_parallel). Returns a list of (stage name, status, seconds).
+        """
+        stages = self.selected(only)
+        is_forced = lambda stage: force is not None and (not force or matches(stage.name, force))
+        if jobs > 1:
+            return self.run_parallel(stages, is_forced, jobs, cores or os.cpu_count() or 1)
+
+        timings = []
+        for stage in stages:
+            status, elapsed = self.run_stage(stage, force=is_forced(stage))
+            timings.append((stage.name, status, elapsed))
+        return timings
+
+    def run_parallel(self, stages, is_forced, jobs, cores):
+        """
+        Dependency-aware scheduler. A stage is started once all of its selected
+        dependencies have finished, at most `jobs` stages run at a time, and the
+        sum of their `cores` stays within `cores` (a stage larger than the whole
+        budget still runs, alone). Freshness is checked when a stage becomes ready,
+        so it sees the outputs of the stages it depends on.
+        """
+        selected = {stage.name for stage in stages}
+        pending = list(stages)
+        finished = set()
+        running = {}
+        timings = {}
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while pending or running:
+                used = sum(stage.cores for stage, _ in running.values())
+                for stage in list(pending):
+                    if any(dep in selected and dep not in finished for dep in stage.deps):
+                        continue
+                    if len(running) >= jobs or (running and used + stage.cores > cores):
+                        continue
+                    pending.remove(stage)
+                    run, inputs_hash = self.needs_run(stage, is_forced(stage))
+                    if not run:
+                        finished.add(stage.name)
+                        timings[stage.name] = (stage.name, "skipped", 0.0)
+                        continue
+                    print(f"====== {stage.name} (started, {stage.cores} cores) ======")
+                    future = pool.submit(execute, stage.fn, self.project_root, stage.kwargs)
+                    running[future] = (stage, inputs_hash)
+                    used += stage.cores
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, inputs_hash = running.pop(future)
+                    elapsed = future.result()
+                    self.record(stage, inputs_hash, elapsed)
+                    finished.add(stage.name)
+                    timings[stage.name] = (stage.name, "ran", elapsed)
+
+        return [timings[stage.name] for stage in stages]
+
+
+def print_timings(timings, wall=None):
+    print("====== Stage timings ======")
+    for name, status, elapsed in timings:
+        print(f"  {name:<16} {status:<8} {elapsed:8.2f}s")
+    print(f"  {'total':<16} {'':<8} {sum(t[2] for t in timings):8.2f}s")
+    if wall is not None:
+        print(f"  {'wall clock':<16} {'':<8} {wall:8.2f}s")
+
+
+def write_timing_metrics(path, timings, wall):
+    """
+    Writes the last run's stage durations in the Prometheus text format, e.g.
+    for node_exporter's textfile collector. Replaced atomically on each run.
+    """
+    registry = metrics.MetricsRegistry()
+    stage_seconds = registry.gauge("pcv_pipeline_stage_seconds",
+                                   "Duration of each stage in the last pipeline run (0 if skipped).",
+                                   ["stage", "status"])
+    for name, status, elapsed in timings:
+        stage_seconds.set(round(elapsed, 3), stage=name, status=status)
+    registry.gauge("pcv_pipeline_wall_seconds", "Wall-clock time of the last pipeline run.").set(round(wall, 3))
+    registry.gauge("pcv_pipeline_last_run_timestamp_seconds", "When the last pipeline run finished.").set(
+        round(time.time(), 3))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,151 @@
+import os
+import time
+import struct
+import threading
+from collections import OrderedDict
+import predict
+
+# Entries kept per model (0 disables caching) and optional time-to-live in seconds
+CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0")) or None
+
+
+class CacheBackend:
+    """
+    Storage interface behind PredictionCache. Keys are strings and values are
+    floats, so a shared cache (e.g. Redis or memcached, with its own size and
+    TTL policy) can be plugged in by implementing get/set/clear.
+    """
+    def get(self, key):
+        """
+        Returns the cached value, or None on a miss.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Backend-specific counters merged into PredictionCache.stats().
+        """
+        return {}
+
+
+class LRUBackend(CacheBackend):
+    """
+    In-process backend: an OrderedDict bounded to `max_size` entries with
+    least-recently-used eviction and an optional per-entry TTL. Thread-safe,
+    as gunicorn's gthread workers share it between request threads.
+    """
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and self.clock() >= expires:
+                del self.entries[key]
+                self.expirations += 1
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires = self.clock() + self.ttl if self.ttl else None
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"size": len(self.entries), "max_size": self.max_size, "ttl": self.ttl,
+                "evictions": self.evictions, "expirations": self.expirations}
+
+
+def canonical_key(values, brand):
+    """
+    Canonical form of a validated feature payload. Numbers are rounded to
+    float32, the precision the model scores at, so 20588, 20588.0 and "20588"
+    share one entry.
+    """
+    as_float32 = struct.unpack(f"{len(values)}f", struct.pack(f"{len(values)}f", *values))
+    numbers = ",".join(map(repr, as_float32))
+    return f"{numbers}|{brand}"
+
+
+class PredictionCache:
+    """
+    Memoizes single-row predictions of one model. Keys are prefixed with the
+    version (a hash of the .cbm file) of the model passed in, so a price is
+    always stored and found under the model that scored it, even when a reload
+    lands mid-request; entries from a previous model age out of the backend.
+    """
+    def __init__(self, label, backend=None):
+        self.label = label
+        self.backend = backend if backend is not None else LRUBackend()
+        # Request threads share the cache; the counters are updated under this lock
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, model_version, values, brand):
+        return f"{self.label}:{model_version}:{canonical_key(values, brand)}"
+
+    def predict(self, model, model_version, data):
+        """
+        predict.predict_one with memoization. Invalid payloads raise
+        predict.ValidationError before the cache is consulted.
+        """
+        values, brand = predict.validate_record(data)
+        return self.score(model, model_version, values, brand)
+
+    def score(self, model, model_version, values, brand):
+        """
+        predict.score_one with memoization, for an already-validated row.
+        """
+        key = self.key(model_version, values, brand)
+        price = self.backend.get(key)
+        if price is not None:
+            with self.lock:
+                self.hits += 1
+            return price
+        with self.lock:
+            self.misses += 1
+        price = predict.score_one(model, values, brand)
+        self.backend.set(key, price)
+        return price
+
+    def stats(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            **self.backend.stats(),
+        }
@@ -0,0 +1,155 @@
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+from oblivious import ObliviousTrees
+
+# Feature layout shared with preproc.preprocess_for_catboost
+FEATURES = ["PassMark_Score", "ValueScore", "Rank", "Brand"]
+NUMERIC_FEATURES = ["PassMark_Score", "ValueScore", "Rank"]
+CAT_FEATURES = ["Brand"]
+
+# Upper bound on rows scored by a single batch request
+MAX_BATCH_ROWS = int(os.environ.get("MAX_BATCH_ROWS", "10000"))
+
+
+class ValidationError(ValueError):
+    """
+    Raised when a payload cannot be scored. Carries the HTTP status to return.
+    """
+    def __init__(self, message, status=400, rows=None):
+        super().__init__(message)
+        self.status = status
+        self.rows = rows or []
+
+
+def parse_batch_body(body, content_type=""):
+    """
+    Parses a batch request body given either as a JSON array of objects
+    or as NDJSON (one JSON object per line). Returns a list of records.
+    """
+    try:
+        text = body.decode("utf-8") if isinstance(body, bytes) else body
+    except UnicodeDecodeError as err:
+        raise ValidationError(f"Request body is not valid UTF-8: {err}")
+    text = text.strip()
+    if not text:
+        raise ValidationError("Empty request body")
+
+    try:
+        if "ndjson" in content_type or not text.startswith("["):
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            records = json.loads(text)
+    except ValueError as err:
+        raise ValidationError(f"Malformed JSON: {err}")
+
+    if not isinstance(records, list):
+        raise ValidationError("Expected a JSON array or NDJSON body")
+    return records
+
+
+def validate_batch(records, max_rows=MAX_BATCH_ROWS):
+    """
+    Validates a list of feature records column-wise and returns a DataFrame
+    with the model's feature columns in input order.
+    """
+    if len(records) == 0:
+        raise ValidationError("Batch contains no rows")
+    if len(records) > max_rows:
+        raise ValidationError(f"Batch of {len(records)} rows exceeds limit of {max_rows}", status=413)
+
+    bad_rows = [i for i, rec in enumerate(records) if not isinstance(rec, dict)]
+    if bad_rows:
+        raise ValidationError("Every row must be a JSON object", rows=bad_rows)
+
+    df = pd.DataFrame.from_records(records, columns=FEATURES)
+
+    for col in NUMERIC_FEATURES:
+        raw = df[col]
+        df[col] = pd.to_numeric(raw, errors="coerce")
+        bad = df[col].isna() | ~np.isfinite(df[col])
+        if bad.any():
+            rows = np.flatnonzero(bad.to_numpy()).tolist()
+            raise ValidationError(f"Missing or non-numeric '{col}'", rows=rows)
+
+    # Same fill as preprocess_for_catboost
+    df["Brand"] = df["Brand"].where(df["Brand"].notna(), "Unknown").astype(str)
+    return df
+
+
+def features_from_frame(df):
+    """
+    Model features for the rows of a cleaned catalog, in the layout validate_batch returns.
+    """
+    features = df[FEATURES].copy()
+    for col in NUMERIC_FEATURES:
+        features[col] = features[col].astype(float)
+    features["Brand"] = features["Brand"].astype(object).where(features["Brand"].notna(), "Unknown").astype(str)
+    return features.reset_index(drop=True)
+
+
+def validate_record(data):
+    """
+    Validates a single feature payload without pandas.
+    Returns the numeric features as a list of floats and the Brand string.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("Expected a JSON object")
+
+    values = []
+    for col in NUMERIC_FEATURES:
+        try:
+            value = float(data[col])
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(f"Missing or non-numeric '{col}'")
+        if not math.isfinite(value):
+            raise ValidationError(f"Missing or non-numeric '{col}'")
+        values.append(value)
+
+    brand = data.get("Brand")
+    brand = "Unknown" if brand is None else str(brand)
+    return values, brand
+
+
+def raw_predict(model, num, brands):
+    """
+    Log-price predictions of a CatBoostRegressor or an exported ObliviousTrees
+    model for an (n, 3) float32 array and an (n,) object array of brands.
+    catboost is only imported when a CatBoost model is used.
+    """
+    if isinstance(model, ObliviousTrees):
+        return model.predict_arrays(num, brands)
+    from catboost import FeaturesData
+    return model.predict(FeaturesData(num_feature_data=num, cat_feature_data=brands.reshape(-1, 1)))
+
+
+def predict_one(model, data):
+    """
+    Fast path for single-row inference. Builds the numeric and categorical
+    buffers directly (CatBoost gets them as FeaturesData), skipping
+    DataFrame construction and dtype inference.
+    """
+    values, brand = validate_record(data)
+    return score_one(model, values, brand)
+
+
+def score_one(model, values, brand):
+    """
+    Scores one already-validated row (see validate_record).
+    """
+    # FeaturesData marks its buffers read-only, so they are built per call
+    num = np.array([values], dtype=np.float32)
+    pred = raw_predict(model, num, np.array([brand], dtype=object))[0]
+    return round(float(np.expm1(pred)), 2)
+
+
+def predict_batch(model, features_df):
+    """
+    Scores every row in a single vectorized predict call and returns
+    estimated prices in dollars, in input order.
+    """
+    num = np.ascontiguousarray(features_df[NUMERIC_FEATURES].to_numpy(dtype=np.float32))
+    brands = features_df["Brand"].to_numpy(dtype=object)
+    return np.round(np.expm1(raw_predict(model, num, brands)), 2)
@@ -1,6 +1,5 @@
-import os
-import pandas as pd
 import numpy as np
+import storage
 
 def remove_price_outliers(df, price_col="Price"):
     """
@@ -16,20 +15,16 @@ def remove_price_outliers(df, price_col="Price"):
 
 def load_data(project_root):
     """
-    Loads raw CPU and GPU benchmark CSVs.
+    Loads raw CPU and GPU benchmark datasets.
     """
-    raw_dir = os.path.join(project_root, "data")
-    cpu_raw_path = os.path.join(raw_dir, "cpu_passmark.csv")
-    gpu_raw_path = os.path.join(raw_dir, "gpu_passmark.csv")
-
-    cpu_df = pd.read_csv(cpu_raw_path)
-    gpu_df = pd.read_csv(gpu_raw_path)
+    cpu_df = storage.load_frame(project_root, "cpu_passmark")
+    gpu_df = storage.load_frame(project_root, "gpu_passmark")
     return cpu_df, gpu_df
 
 
 def clean_data(cpu_df, gpu_df, project_root):
     """
-    Cleans raw CPU and GPU DataFrames, removes outliers, and saves cleaned CSVs.
+    Cleans raw CPU and GPU DataFrames, removes outliers, and saves cleaned datasets.
     """
     # Drop missing entries
     cpu_df.dropna(inplace=True)
@@ -50,14 +45,8 @@ def clean_data(cpu_df, gpu_df, project_root):
     gpu_df["Brand"] = gpu_df["GPU"].str.extract(r"^(NVIDIA|AMD)", expand=False)
 
     # Save cleaned data
-    clean_dir = os.path.join(project_root, "data")
-    os.makedirs(clean_dir, exist_ok=True)
-
-    cpu_clean_path = os.path.join(clean_dir, "cpu_clean.csv")
-    gpu_clean_path = os.path.join(clean_dir, "gpu_clean.csv")
-
-    cpu_df.to_csv(cpu_clean_path, index=False)
-    gpu_df.to_csv(gpu_clean_path, index=False)
+    cpu_clean_path = storage.save_frame(cpu_df, project_root, "cpu_clean")
+    gpu_clean_path = storage.save_frame(gpu_df, project_root, "gpu_clean")
 
     print(f"✔ Saved cleaned CPU data to {cpu_clean_path}")
     print(f"✔ Saved cleaned GPU data to {gpu_clean_path}")
@@ -70,7 +59,7 @@ def preprocess_for_catboost(df):
     Prepares features and target for CatBoost. Assumes 'Brand' column exists.
     """
     df = df.copy()
-    df["Brand"] = df["Brand"].fillna("Unknown")
+    df["Brand"] = df["Brand"].astype(object).fillna("Unknown")
 
     features = ["PassMark_Score", "ValueScore", "Rank", "Brand"]
     X = df[features]
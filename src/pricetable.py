@@ -0,0 +1,80 @@
+import os
+import sys
+import pandas as pd
+import predict
+import storage
+from pipeline import file_hash
+
+
+def model_path(project_root, label):
+    return os.path.join(project_root, "model", f"{label.lower()}_price_model_catboost.cbm")
+
+
+def table_name(label):
+    return f"{label.lower()}_price_table"
+
+
+def build_price_table(df, model, name_col):
+    """
+    Scores a whole cleaned catalog in one batched predict.
+    Returns a frame of part name and estimated price.
+    """
+    prices = predict.predict_batch(model, predict.features_from_frame(df))
+    return pd.DataFrame({"name": df[name_col].to_numpy(), "estimated_price": prices})
+
+
+def save_price_table(project_root, label, name_col):
+    """
+    Pipeline stage: prices the cleaned catalog with the trained model and saves
+    data/<label>_price_table.parquet, tagged with the hash of the model file.
+    """
+    from catboost import CatBoostRegressor
+
+    path = model_path(project_root, label)
+    model = CatBoostRegressor()
+    model.load_model(path)
+    df = storage.load_frame(project_root, f"{label.lower()}_clean")
+
+    table = build_price_table(df, model, name_col)
+    out = storage.save_frame(table, project_root, table_name(label), csv=False,
+                             metadata={"model_hash": file_hash(path)})
+    print(f"Saved {label} price table ({len(table)} parts) to {out}")
+
+
+class PriceTable:
+    """
+    Name -> estimated price lookup over a precomputed table, O(1) per query.
+    `model_hash` identifies the model file the prices came from.
+    """
+    def __init__(self, table, model_hash=None):
+        self.model_hash = model_hash
+        self.prices = {}
+        for name, price in zip(table["name"], table["estimated_price"]):
+            # Interned, so the keys are the name objects of the catalog frame (see storage.compact)
+            self.prices.setdefault(sys.intern(name), float(price))
+
+    def __contains__(self, name):
+        return name in self.prices
+
+    def __len__(self):
+        return len(self.prices)
+
+    def get(self, name):
+        return self.prices.get(name)
+
+
+def load_price_table(project_root, label):
+    """
+    Loads the saved price table for a component. Returns None if it is missing or
+    was built from a different model file than the one now in model/, so a
+    retrained model never serves stale prices.
+    """
+    name = table_name(label)
+    if not storage.exists(project_root, name):
+        return None
+    current = file_hash(model_path(project_root, label))
+    saved = storage.load_metadata(project_root, name).get("model_hash")
+    if current is None or saved != current:
+        print(f"[PriceTable] {name} is stale (model changed), ignoring it")
+        return None
+    return PriceTable(storage.load_frame(project_root, name), current)
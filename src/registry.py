@@ -0,0 +1,216 @@
+import os
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import metrics
+import predict
+import pricetable
+from oblivious import ObliviousTrees, export_path
+from predcache import PredictionCache
+from pipeline import file_hash
+
+# Seconds between checks of model/ for retrained files (0 disables the watcher)
+WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "10"))
+# Rows in the synthetic batch scored before a new model takes traffic
+WARMUP_ROWS = 32
+# "numpy" serves the flat .npz export written by cat.py (see oblivious.py)
+# instead of the .cbm, without importing catboost
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "catboost")
+
+
+def warmup_frame(rows=WARMUP_ROWS, seed=0):
+    """
+    Synthetic feature rows spanning the PassMark ranges, in the layout of predict.validate_batch.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "PassMark_Score": rng.uniform(500, 40000, rows),
+        "ValueScore": rng.uniform(1, 100, rows),
+        "Rank": rng.integers(1, 3000, rows).astype(float),
+        "Brand": rng.choice(["Intel", "AMD", "NVIDIA", "Unknown"], rows),
+    })[predict.FEATURES]
+
+
+def warm_up(model, rows=WARMUP_ROWS):
+    """
+    Runs the batch and single-row paths once, so the first real request
+    does not pay for CatBoost's lazy initialization.
+    """
+    features = warmup_frame(rows)
+    predict.predict_batch(model, features)
+    for record in features.head(4).to_dict("records"):
+        predict.predict_one(model, record)
+
+
+class LoadedModel:
+    """
+    One loaded model version and the price table built from it. Instances are
+    never mutated; a reload swaps in a new one, so a request that fetched it
+    scores and reports a single consistent version.
+    """
+    def __init__(self, label, model, digest, prices=None):
+        self.label = label
+        self.model = model
+        self.digest = digest
+        self.version = digest[:12]
+        self.prices = prices
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def describe(self):
+        backend = "numpy" if isinstance(self.model, ObliviousTrees) else "catboost"
+        return {"version": self.version, "loaded_at": self.loaded_at, "backend": backend}
+
+
+class ModelRegistry:
+    """
+    Holds the current model of each component. Models are loaded and warmed
+    off the request path and swapped in with a single reference assignment,
+    so in-flight requests finish on the version they started with.
+    A daemon thread per process polls model/ and reloads files that change.
+    """
+    def __init__(self, project_root, labels=("CPU", "GPU"), indexes=None, watch_interval=WATCH_INTERVAL,
+                 backend=INFERENCE_BACKEND):
+        self.project_root = project_root
+        self.indexes = indexes or {}
+        self.backend = backend
+        self.watch_interval = watch_interval
+        self.reload_lock = threading.Lock()
+        self.watcher_lock = threading.Lock()
+        self.watcher_pid = None
+        self.errors = {}
+        self.models = {}
+        self.caches = {}
+        self.seen = {}
+        for label in labels:
+            self.seen[label] = self.file_state(label)
+            self.models[label] = self.load(label)
+            self.caches[label] = PredictionCache(label)
+            self.publish(label)
+
+    def path(self, label):
+        return pricetable.model_path(self.project_root, label)
+
+    def file_state(self, label):
+        try:
+            stat = os.stat(self.path(label))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, label):
+        return self.models[label]
+
+    def publish(self, label, previous=None):
+        """
+        Points the pcv_model_info metric at the version now serving.
+        """
+        if previous is not None:
+            info = previous.describe()
+            metrics.MODEL_INFO.remove(model=label, version=info["version"], backend=info["backend"])
+        info = self.models[label].describe()
+        metrics.MODEL_INFO.set(1, model=label, version=info["version"], backend=info["backend"])
+
+    def versions(self):
+        """
+        Serving version of each model, plus the error of its last failed reload if any.
+        """
+        versions = {label: loaded.describe() for label, loaded in self.models.items()}
+        for label, error in self.errors.items():
+            versions[label]["reload_error"] = error
+        return versions
+
+    def load_model(self, label, blob, digest):
+        """
+        The model to serve for a .cbm file's bytes: its NumPy export when the
+        numpy backend is selected and the export was made from this exact
+        file, otherwise the CatBoost model itself.
+        """
+        if self.backend == "numpy":
+            try:
+                trees = ObliviousTrees.load(export_path(self.path(label)))
+                if trees.source_hash == digest:
+                    return trees
+                print(f"[Registry] {label} NumPy export does not match the model file, using CatBoost")
+            except (OSError, ValueError, KeyError) as err:
+                print(f"[Registry] {label} NumPy export not loaded ({err}), using CatBoost")
+        from catboost import CatBoostRegressor
+        model = CatBoostRegressor()
+        model.load_model(blob=blob)
+        return model
+
+    def load(self, label):
+        """
+        Reads, warms and prices one model file. The bytes are read once, so
+        the version hash always matches the model that was loaded.
+        """
+        start = time.perf_counter()
+        with open(self.path(label), "rb") as f:
+            blob = f.read()
+        digest = hashlib.sha256(blob).hexdigest()
+        model = self.load_model(label, blob, digest)
+        warm_up(model)
+
+        prices = pricetable.load_price_table(self.project_root, label)
+        index = self.indexes.get(label)
+        if (prices is None or prices.model_hash != digest) and index is not None:
+            prices = pricetable.PriceTable(
+                pricetable.build_price_table(index.df, model, index.name_col), digest
+            )
+        elapsed = time.perf_counter() - start
+        metrics.MODEL_LOAD_SECONDS.observe(elapsed, model=label)
+        print(f"[Registry] {label} model {digest[:12]} loaded in {elapsed:.2f}s")
+        return LoadedModel(label, model, digest, prices)
+
+    def reload(self, labels=None, force=False):
+        """
+        Reloads the given components (default: all) whose model file changed,
+        or all of them with force=True. A file that fails to load leaves the
+        current version serving. Returns {label: {"from": ..., "to": ...}}.
+        """
+        results = {}
+        with self.reload_lock:
+            for label in labels or list(self.models):
+                current = self.models[label]
+                self.seen[label] = self.file_state(label)
+                try:
+                    if not force and file_hash(self.path(label)) == current.digest:
+                        results[label] = {"from": current.version, "to": current.version}
+                        continue
+                    loaded = self.load(label)
+                except Exception as err:
+                    self.errors[label] = str(err)
+                    print(f"[Registry] {label} reload failed, keeping {current.version}: {err}")
+                    results[label] = {"from": current.version, "to": current.version, "error": str(err)}
+                    continue
+                self.models[label] = loaded
+                self.publish(label, previous=current)
+                self.errors.pop(label, None)
+                print(f"[Registry] {label} model {current.version} -> {loaded.version}")
+                results[label] = {"from": current.version, "to": loaded.version}
+        return results
+
+    def reload_async(self, labels=None, force=False):
+        thread = threading.Thread(target=self.reload, args=(labels, force), daemon=True)
+        thread.start()
+        return thread
+
+    def watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            changed = [label for label in self.models if self.file_state(label) != self.seen[label]]
+            if changed:
+                self.reload(changed)
+
+    def ensure_watcher(self):
+        """
+        Starts the watcher thread in this process if it is not running yet.
+        Threads do not survive fork, so each gunicorn worker starts its own.
+        """
+        if self.watch_interval <= 0 or self.watcher_pid == os.getpid():
+            return
+        with self.watcher_lock:
+            if self.watcher_pid != os.getpid():
+                threading.Thread(target=self.watch, daemon=True).start()
+                self.watcher_pid = os.getpid()
@@ -1,111 +1,122 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
+from dataclasses import dataclass
+from fetch import Fetcher
+from tableparse import parse_passmark_table
+import storage
 
-# Avoid bot detection
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                  "(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
-}
 
-def get_soup(url):
+@dataclass(frozen=True)
+class ScrapeSpec:
     """
-    Fetches and parses HTML from the given URL with polite delays and error handling.
+    Describes one PassMark list: where it lives, what the name column is
+    called and which raw dataset it is saved as. Adding a new list only needs a spec.
+    """
+    label: str
+    url: str
+    name_col: str
+    dataset: str
+    table_id: str = "cputable"
+
+
+CPU_SPEC = ScrapeSpec("CPU", "https://www.cpubenchmark.net/cpu_list.php", "CPU", "cpu_passmark")
+GPU_SPEC = ScrapeSpec("GPU", "https://www.videocardbenchmark.net/gpu_list.php", "GPU", "gpu_passmark")
+SPECS = [CPU_SPEC, GPU_SPEC]
+
+# A scrape that rejects more than this share of its rows (e.g. after a page
+# layout change) is not saved, so the previous dataset stays in place
+MAX_REJECTED_FRACTION = 0.5
+
+# One fetcher (connection pool, rate limiter, conditional cache) per cache directory
+_fetchers = {}
+
+
+def get_fetcher(project_root=None):
+    """
+    Returns the shared Fetcher for a project. Pages are cached under
+    data/http_cache so unchanged lists can be answered with 304 Not Modified.
+    """
+    cache_dir = os.path.join(project_root, "data", "http_cache") if project_root else None
+    if cache_dir not in _fetchers:
+        _fetchers[cache_dir] = Fetcher(cache_dir=cache_dir)
+    return _fetchers[cache_dir]
+
+
+def get_soup(url, fetcher=None):
+    """
+    Fetches and parses HTML from the given URL with per-host rate limiting and retries.
     Returns a BeautifulSoup object if successful, None otherwise.
     """
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        time.sleep(random.uniform(1.5, 3.5))  # Random delay to mimic human behavior
-        return BeautifulSoup(response.text, 'html.parser')
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
+    from bs4 import BeautifulSoup
+
+    page = (fetcher or get_fetcher()).fetch(url)
+    if page is None:
         return None
+    return BeautifulSoup(page.text, 'html.parser')
 
-def scrape_passmark_cpu(project_root):
+
+def is_unchanged(page, project_root, dataset, label):
     """
-    Scrapes CPU Name, Score, Rank, Value Score, and Price from PassMark.
-    Saves output as data/cpu_passmark.csv.
+    True when the server reported the list as not modified and the
+    previously scraped dataset is still on disk, so parsing can be skipped.
     """
+    if page.not_modified and storage.exists(project_root, dataset):
+        print(f"{label} list unchanged since last scrape, keeping data/{dataset}")
+        return True
+    return False
 
-    url = "https://www.cpubenchmark.net/cpu_list.php"
-    soup = get_soup(url)
-    if not soup: return
 
-    table = soup.find('table', {'id': 'cputable'})
-    rows = table.find_all('tr')
+def scrape_component(spec, project_root, page=None):
+    """
+    Scrapes one PassMark list described by `spec` and saves its raw dataset under data/.
+    An empty or mostly rejected scrape is not saved.
+    Returns the scraped DataFrame, or None if nothing new was written.
+    """
+    if page is None:
+        page = get_fetcher(project_root).fetch(spec.url)
+    if not page: return None
+    if is_unchanged(page, project_root, spec.dataset, spec.label): return None
+
+    parsed = parse_passmark_table(page.text, spec.name_col, spec.table_id)
+    if parsed is None:
+        print(f"No {spec.label} table found on {page.url}")
+        return None
+    df, rejected = parsed
 
-    cpu_data = []
-    for row in rows[1:]:
-        cols = row.find_all('td')
-        if len(cols) < 5:
-            continue
+    details = ", ".join(f"{reason}: {count}" for reason, count in rejected.items())
+    total = len(df) + sum(rejected.values())
+    if df.empty or sum(rejected.values()) > MAX_REJECTED_FRACTION * total:
+        print(f"Refusing to save {spec.label} list from {page.url}: {len(df)} of {total} rows parsed"
+              + (f" ({details})" if details else "") + f", keeping data/{spec.dataset}")
+        return None
 
-        name = cols[0].get_text(strip=True)
-        score = cols[1].get_text(strip=True).replace(",", "")
-        rank = cols[2].get_text(strip=True).replace(",", "")
-        value = cols[3].get_text(strip=True)
-        price = cols[4].get_text(strip=True).replace("$", "").replace("*", "").replace(",", "")
+    storage.save_frame(df, project_root, spec.dataset)
+    print(f"Scraped {len(df)} {spec.label}s with scores, prices, and value.")
+    if rejected:
+        print(f"  Rejected {sum(rejected.values())} {spec.label} rows ({details})")
+    return df
 
-        try:
-            cpu_data.append({
-                "CPU": name,
-                "PassMark_Score": int(score) if score != "NA" else None,
-                "Rank": int(rank) if rank != "NA" else None,
-                "ValueScore": float(value) if value != "NA" else None,
-                "Price": float(price) if price != "NA" else None
-            })
-        except:
-            continue
 
-    df = pd.DataFrame(cpu_data)
+def scrape_all(project_root, specs=SPECS):
+    """
+    Fetches every list concurrently, then parses and saves each one.
+    """
+    pages = get_fetcher(project_root).fetch_all([spec.url for spec in specs])
+    for spec, page in zip(specs, pages):
+        if page:
+            scrape_component(spec, project_root, page=page)
+
+
+def scrape_passmark_cpu(project_root):
+    """
+    Scrapes CPU Name, Score, Rank, Value Score, and Price from PassMark.
+    Saves output as data/cpu_passmark.parquet.
+    """
+    return scrape_component(CPU_SPEC, project_root)
 
-    cpu_path = os.path.join(project_root, 'data', 'cpu_passmark.csv')
-    df.to_csv(cpu_path, index=False)
-    print(f"Scraped {len(df)} CPUs with scores, prices, and value.")
 
 def scrape_passmark_gpu(project_root):
     """
     Scrapes GPU Name, Score, Rank, Value Score, and Price from PassMark.
-    Saves output as data/gpu_passmark.csv.
-    """
-    os.makedirs("../data", exist_ok=True)
-
-    url = "https://www.videocardbenchmark.net/gpu_list.php"
-    soup = get_soup(url)
-    if not soup: return
-
-    table = soup.find('table', {'id': 'cputable'})
-    rows = table.find_all('tr')
-
-    gpu_data = []
-    for row in rows[1:]:
-        cols = row.find_all('td')
-        if len(cols) < 5:
-            continue
-
-        name = cols[0].get_text(strip=True)
-        score = cols[1].get_text(strip=True).replace(",", "")
-        rank = cols[2].get_text(strip=True).replace(",", "")
-        value = cols[3].get_text(strip=True)
-        price = cols[4].get_text(strip=True).replace("$", "").replace("*", "").replace(",", "")
-
-        try:
-            gpu_data.append({
-                "GPU": name,
-                "PassMark_Score": int(score) if score != "NA" else None,
-                "Rank": int(rank) if rank != "NA" else None,
-                "ValueScore": float(value) if value != "NA" else None,
-                "Price": float(price) if price != "NA" else None
-            })
-        except:
-            continue
-
-    df = pd.DataFrame(gpu_data)
-    gpu_path = os.path.join(project_root, 'data', 'gpu_passmark.csv')
-    df.to_csv(gpu_path, index=False)
-    print(f"Scraped {len(df)} GPUs with scores, prices, and value.")
-
+    Saves output as data/gpu_passmark.parquet.
+    """
+    return scrape_component(GPU_SPEC, project_root)
@@ -0,0 +1,66 @@
+import os
+import argparse
+import multiprocessing
+from gunicorn.app.base import BaseApplication
+
+
+class PredictionServer(BaseApplication):
+    """
+    Runs the Flask prediction API under gunicorn.
+    The API module (and both CatBoost models) is imported in the master process
+    before workers fork, so the loaded models are shared copy-on-write.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from api import flask_app
+        return flask_app
+
+
+def default_workers():
+    return min(multiprocessing.cpu_count(), 4)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the PC Value Estimator prediction API.")
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", "5050")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("API_WORKERS", default_workers())),
+                        help="Number of worker processes")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("API_THREADS", "4")),
+                        help="Request threads per worker")
+    parser.add_argument("--keep-alive", type=int, default=int(os.environ.get("API_KEEPALIVE", "5")),
+                        help="Seconds to hold idle keep-alive connections open")
+    parser.add_argument("--timeout", type=int, default=int(os.environ.get("API_TIMEOUT", "30")),
+                        help="Seconds before a silent worker is restarted")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        # gthread workers are required for keep-alive support
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "keepalive": args.keep_alive,
+        "timeout": args.timeout,
+        "preload_app": True,
+        "accesslog": "-",
+    }
+    print(f"==> Serving prediction API on {options['bind']} "
+          f"({args.workers} workers x {args.threads} threads)")
+    PredictionServer(options).run()
+
+
+if __name__ == "__main__":
+    main()
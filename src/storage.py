@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = ["Brand"]
+
+# Narrow dtypes of the cleaned catalogs held by the serving processes (see compact);
+# the integer columns fall back to float32 if they have gaps
+COMPACT_DTYPES = {"PassMark_Score": "int32", "ValueScore": "float32", "Rank": "int32", "Price": "float32"}
+
+# Set EXPORT_CSV=1 to also write a CSV copy of every dataset
+EXPORT_CSV = os.environ.get("EXPORT_CSV", "0") == "1"
+
+
+def dataset_path(project_root, name, fmt="parquet"):
+    """
+    Path of a dataset under data/, e.g. dataset_path(root, "cpu_clean") -> data/cpu_clean.parquet
+    """
+    return os.path.join(project_root, "data", f"{name}.{fmt}")
+
+
+def exists(project_root, name):
+    """
+    True if the dataset is on disk in either Parquet or CSV form.
+    """
+    return any(os.path.exists(dataset_path(project_root, name, fmt)) for fmt in ("parquet", "csv"))
+
+
+def to_storage_types(df):
+    """
+    Returns a copy with categorical columns dictionary-encoded for storage.
+    """
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def save_frame(df, project_root, name, csv=None, metadata=None):
+    """
+    Writes a dataset as typed Parquet (Brand as a dictionary column), plus a CSV
+    copy when csv=True or EXPORT_CSV=1. `metadata` is an optional JSON-able dict
+    stored in the Parquet schema (see load_metadata). Returns the Parquet path.
+    """
+    path = dataset_path(project_root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(to_storage_types(df), preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), b"pcv": json.dumps(metadata).encode()
+        })
+    pq.write_table(table, path)
+
+    if EXPORT_CSV if csv is None else csv:
+        df.to_csv(dataset_path(project_root, name, "csv"), index=False)
+    return path
+
+
+def load_frame(project_root, name, columns=None):
+    """
+    Reads a dataset, memory-mapping the Parquet file. Falls back to the CSV
+    (e.g. data written before the Parquet layer existed) if there is no Parquet file.
+    """
+    path = dataset_path(project_root, name)
+    if os.path.exists(path):
+        return pd.read_parquet(path, columns=columns, engine="pyarrow", memory_map=True)
+    return to_storage_types(pd.read_csv(dataset_path(project_root, name, "csv"), usecols=columns))
+
+
+def load_metadata(project_root, name):
+    """
+    Returns the metadata dict stored with a Parquet dataset by save_frame ({} if none).
+    """
+    schema = pq.read_schema(dataset_path(project_root, name))
+    raw = (schema.metadata or {}).get(b"pcv")
+    return json.loads(raw) if raw else {}
+
+
+def compact(df, name_col=None):
+    """
+    A copy of a cleaned catalog in its compact serving layout: Brand as a
+    category, the numeric columns as float32/int32 (the precision the models
+    score in) and the part names interned, so the indexes and price tables
+    built from the frame share one string object per name.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        dtype = COMPACT_DTYPES.get(col)
+        if dtype == "int32" and not (values.notna().all() and np.array_equal(values, values.astype(dtype))):
+            dtype = "float32"
+        if dtype:
+            values = values.astype(dtype)
+        elif col in CATEGORICAL_COLUMNS:
+            values = values.astype("category")
+        elif col == name_col:
+            values = pd.Series([sys.intern(v) if type(v) is str else v for v in values],
+                               index=values.index, dtype=object)
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+# path -> (file signature, frame) of the catalogs loaded by load_shared
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def load_shared(project_root, name, name_col=None):
+    """
+    The compact form of a dataset (see compact), loaded once per process and
+    shared by every caller until the file changes, so the API and the UI
+    embedded with it hold a single copy. Callers must not modify it. Under
+    gunicorn with preload_app the workers inherit it copy-on-write.
+    """
+    path = dataset_path(project_root, name)
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+    with _shared_lock:
+        cached = _shared.get(path)
+        if cached is not None and signature is not None and cached[0] == signature:
+            return cached[1]
+        df = compact(load_frame(project_root, name), name_col)
+        # Hand the buffers of the full-width read back to the OS
+        pa.default_memory_pool().release_unused()
+        _shared[path] = (signature, df)
+        return df
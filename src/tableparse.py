@@ -0,0 +1,201 @@
+import re
+from html.parser import HTMLParser
+import numpy as np
+import pandas as pd
+
+# Raw PassMark list columns, in table order
+PASSMARK_COLUMNS = ["PassMark_Score", "Rank", "ValueScore", "Price"]
+INT_COLUMNS = ["PassMark_Score", "Rank"]
+
+CHUNK_SIZE = 1 << 16
+
+
+class TableRowParser(HTMLParser):
+    """
+    SAX-style extractor for the rows of one <table id=...>.
+    Only cell text is kept; no document tree is built. Cell text matches
+    BeautifulSoup's get_text(strip=True): each text fragment stripped and joined.
+    """
+    def __init__(self, table_id):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.rows = []
+        self.done = False
+        self._depth = 0       # <table> nesting depth inside the target table
+        self._row = None
+        self._cell = None
+        self._text = []       # fragments of the current text node
+
+    def _flush_text(self):
+        # A text node may arrive in several handle_data calls (e.g. across feed chunks)
+        if self._text:
+            text = "".join(self._text).strip()
+            if text:
+                self._cell.append(text)
+            self._text = []
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._flush_text()
+            self._row.append("".join(self._cell))
+            self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._cell is not None:
+            self._flush_text()
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif dict(attrs).get("id") == self.table_id:
+                self._depth = 1
+        elif self._depth == 1:
+            # </td> and </tr> are optional: a new cell or row closes the open one
+            if tag in ("tr", "thead", "tbody", "tfoot"):
+                self._close_row()
+                if tag == "tr":
+                    self._row = []
+            elif tag in ("td", "th") and self._row is not None:
+                self._close_cell()
+                if tag == "td":
+                    self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if self._cell is not None:
+            self._flush_text()
+        if tag == "table":
+            if self._depth == 1:
+                self._close_row()
+            self._depth -= 1
+            if not self._depth:
+                self.done = True
+        elif self._depth == 1:
+            if tag == "td":
+                self._close_cell()
+            elif tag in ("tr", "thead", "tbody", "tfoot"):
+                self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._text.append(data)
+
+
+def extract_rows_streaming(html, table_id="cputable"):
+    """
+    Feeds the page to TableRowParser in chunks and stops once the table closes.
+    Markup before the table's opening tag is skipped without being parsed.
+    Returns a list of rows (lists of cell strings), or None if the table was
+    not found or no data rows were read from it.
+    """
+    match = re.search(r"<table\b[^>]*\bid\s*=\s*[\"']?" + re.escape(table_id) + r"\b", html, re.I)
+    if match is None:
+        return None
+
+    parser = TableRowParser(table_id)
+    for start in range(match.start(), len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        if parser.done:
+            break
+    parser.close()
+    if not any(parser.rows[1:]):
+        return None
+    return parser.rows
+
+
+def extract_rows_bs4(html, table_id="cputable"):
+    """
+    BeautifulSoup fallback with the same output as extract_rows_streaming.
+    """
+    from bs4 import BeautifulSoup
+
+    table = BeautifulSoup(html, 'html.parser').find('table', {'id': table_id})
+    if table is None:
+        return None
+    return [[td.get_text(strip=True) for td in tr.find_all('td')] for tr in table.find_all('tr')]
+
+
+def extract_rows(html, table_id="cputable", parser="stream"):
+    """
+    Extracts table rows with the streaming parser, falling back to BeautifulSoup
+    if it is requested or the streaming parser finds no table or no data rows.
+    """
+    rows = None
+    if parser == "stream":
+        try:
+            rows = extract_rows_streaming(html, table_id)
+        except Exception as e:
+            print(f"Streaming table parser failed ({e}), falling back to BeautifulSoup")
+    if rows is None:
+        rows = extract_rows_bs4(html, table_id)
+    return rows
+
+
+def parse_numeric(raw, integer=False):
+    """
+    Converts a Series of cleaned cell strings to numbers in bulk.
+    "NA" becomes NaN; returns the values and a mask of unparseable cells.
+    """
+    values = pd.to_numeric(raw.where(raw != "NA"), errors="coerce")
+    invalid = values.isna() & (raw != "NA")
+    if integer:
+        invalid |= values.notna() & (values % 1 != 0)
+    return values, invalid
+
+
+def rows_to_frame(rows, name_col):
+    """
+    Builds the raw PassMark frame (name, score, rank, value, price) from extracted rows.
+    Cleaning and parsing run column-wise. The header row is skipped; rows with fewer
+    than five cells or unparseable numbers are rejected and counted by reason.
+    Returns the frame and a dict of rejection counts.
+    """
+    body = rows[1:]
+    rejected = {}
+    rows = [row[:5] for row in body if len(row) >= 5]
+    if len(rows) < len(body):
+        rejected["too few cells"] = len(body) - len(rows)
+    if not rows:
+        return pd.DataFrame(columns=[name_col] + PASSMARK_COLUMNS), rejected
+
+    raw = pd.DataFrame(rows, columns=[name_col] + PASSMARK_COLUMNS)
+    raw["PassMark_Score"] = raw["PassMark_Score"].str.replace(",", "", regex=False)
+    raw["Rank"] = raw["Rank"].str.replace(",", "", regex=False)
+    raw["Price"] = raw["Price"].str.replace(r"[$*,]", "", regex=True)
+
+    df = raw[[name_col]].copy()
+    invalid = np.zeros(len(raw), dtype=bool)
+    for col in PASSMARK_COLUMNS:
+        df[col], bad = parse_numeric(raw[col], integer=col in INT_COLUMNS)
+        bad = bad.to_numpy()
+        # Count each rejected row once, under the first bad column
+        new_bad = int((bad & ~invalid).sum())
+        if new_bad:
+            rejected[f"bad {col}"] = new_bad
+        invalid |= bad
+
+    df = df[~invalid].reset_index(drop=True)
+    for col in INT_COLUMNS:
+        if df[col].notna().all():
+            df[col] = df[col].astype("int64")
+    return df[[name_col, "PassMark_Score", "Rank", "ValueScore", "Price"]], rejected
+
+
+def parse_passmark_table(html, name_col, table_id="cputable", parser="stream"):
+    """
+    Parses a PassMark list page into a DataFrame of name, PassMark_Score,
+    Rank, ValueScore and Price, plus a dict of rejected-row counts.
+    Returns None if the table is missing.
+    """
+    rows = extract_rows(html, table_id, parser)
+    if rows is None:
+        return None
+    return rows_to_frame(rows, name_col)
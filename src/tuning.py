@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from catboost import CatBoostRegressor, Pool
+from sklearn.model_selection import KFold
+from sklearn.metrics import mean_squared_error
+import cat
+import storage
+from preproc import preprocess_for_catboost
+
+# name -> (kind, low, high); "log" samples uniformly in log space
+SEARCH_SPACE = {
+    "depth": ("int", 4, 8),
+    "learning_rate": ("log", 0.02, 0.3),
+    "l2_leaf_reg": ("log", 1.0, 10.0),
+    "random_strength": ("float", 0.0, 2.0),
+    "bagging_temperature": ("float", 0.0, 1.0),
+}
+# Upper bound per fit; early stopping on the fold's eval set decides the real count
+MAX_ITERATIONS = 2000
+EARLY_STOPPING_ROUNDS = 50
+# A trial is pruned once its running mean RMSE is this much worse than the best trial's
+PRUNE_TOLERANCE = 0.25
+
+
+def sample_params(rng):
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == "int":
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+def cv_frame(df, label):
+    """
+    The rows cross-validation may use: the catalog without the name-hashed
+    holdout (cat.holdout_mask), so the holdout RMSE reported by training
+    stays independent of the parameters tuning picks.
+    """
+    return df[~cat.holdout_mask(df[label])].reset_index(drop=True)
+
+
+def prepare_folds(X, y, cat_features, folds, workdir, seed=42):
+    """
+    Splits the data into K folds and quantizes each fold's train pool once,
+    saving it under workdir. Trials load these files instead of rebuilding
+    the data. Eval pools are built from the raw rows in each worker (see
+    init_worker): a pool quantized on its own gets a categorical encoding
+    that does not match the train pool's, which corrupts the eval metric.
+    """
+    fold_files = []
+    splitter = KFold(n_splits=folds, shuffle=True, random_state=seed)
+    for k, (train_idx, eval_idx) in enumerate(splitter.split(X)):
+        path = os.path.join(workdir, f"fold{k}_train")
+        train_pool = Pool(X.iloc[train_idx], y.iloc[train_idx], cat_features=cat_features)
+        train_pool.quantize()
+        train_pool.save(path)
+        fold_files.append({"train": path, "eval_idx": eval_idx})
+    return fold_files
+
+
+# Per-process fold pools, loaded once by init_worker and reused by every trial
+_folds = []
+
+
+def init_worker(X, y, cat_features, fold_files):
+    _folds.clear()
+    for fold in fold_files:
+        X_eval, y_eval = X.iloc[fold["eval_idx"]], y.iloc[fold["eval_idx"]]
+        _folds.append({
+            "train": Pool("quantized://" + fold["train"]),
+            # Unquantized, so CatBoost encodes it with the train pool's borders and categories
+            "eval": Pool(X_eval, y_eval, cat_features=cat_features),
+            "X_eval": X_eval,
+            "y_eval": np.expm1(y_eval.to_numpy()),
+        })
+
+
+def run_trial(trial, params, thread_count=1, prune_at=None):
+    """
+    Cross-validates one parameter set over the shared fold pools. Each fit
+    stops early on its fold's eval set. `prune_at[k]` is the running mean
+    RMSE above which the trial stops after fold k.
+    """
+    start = time.perf_counter()
+    fold_rmse, iterations = [], []
+    status = "complete"
+    for k, fold in enumerate(_folds):
+        model = CatBoostRegressor(
+            **params,
+            iterations=MAX_ITERATIONS,
+            loss_function="RMSE",
+            one_hot_max_size=cat.ONE_HOT_MAX_SIZE,
+            random_seed=42,
+            verbose=0,
+            thread_count=thread_count,
+            allow_writing_files=False,
+        )
+        model.fit(fold["train"], eval_set=fold["eval"],
+                  early_stopping_rounds=EARLY_STOPPING_ROUNDS, use_best_model=True)
+        preds = np.expm1(model.predict(fold["X_eval"]))
+        fold_rmse.append(float(np.sqrt(mean_squared_error(fold["y_eval"], preds))))
+        iterations.append(model.get_best_iteration() + 1)
+
+        if prune_at and k < len(_folds) - 1 and np.mean(fold_rmse) > prune_at[k]:
+            status = "pruned"
+            break
+
+    return {
+        "trial": trial,
+        "status": status,
+        "params": params,
+        "rmse": round(float(np.mean(fold_rmse)), 4),
+        "fold_rmse": [round(r, 4) for r in fold_rmse],
+        "iterations": int(round(np.mean(iterations))),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def prune_thresholds(best):
+    """
+    Running-mean RMSE limits per fold, derived from the best complete trial.
+    """
+    if best is None:
+        return None
+    running = np.cumsum(best["fold_rmse"]) / np.arange(1, len(best["fold_rmse"]) + 1)
+    return [float(r) * (1 + PRUNE_TOLERANCE) for r in running]
+
+
+def tune(df, label="CPU", trials=20, folds=5, jobs=1, cores=None, seed=42):
+    """
+    Random search over SEARCH_SPACE with K-fold cross-validation. Up to `jobs`
+    trials run at once in a process pool, sharing `cores` CatBoost threads.
+    Each trial is pruned against the best trial finished before it started.
+    The holdout rows are left out (see cv_frame). Returns (best trial, all trials).
+    """
+    X, y, cat_features = preprocess_for_catboost(cv_frame(df, label))
+    rng = np.random.default_rng(seed)
+    thread_count = max(1, (cores or os.cpu_count() or 1) // jobs)
+    results, best = [], None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fold_files = prepare_folds(X, y, cat_features, folds, workdir, seed)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(X, y, cat_features, fold_files)) as pool:
+            running, submitted = set(), 0
+            while submitted < trials or running:
+                while submitted < trials and len(running) < jobs:
+                    running.add(pool.submit(run_trial, submitted, sample_params(rng),
+                                            thread_count, prune_thresholds(best)))
+                    submitted += 1
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results.append(result)
+                    print(f"[Tune {label}] trial {result['trial']:>3} {result['status']:<8} "
+                          f"RMSE ${result['rmse']:.2f} over {len(result['fold_rmse'])} folds, "
+                          f"{result['iterations']} iterations, {result['seconds']:.1f}s")
+                    if result["status"] == "complete" and (best is None or result["rmse"] < best["rmse"]):
+                        best = result
+
+    return best, sorted(results, key=lambda r: r["trial"])
+
+
+def save_best_params(model_path, best, results, folds):
+    """
+    Writes the best parameters next to the model file (see cat.params_path);
+    the next training run picks them up.
+    """
+    path = cat.params_path(model_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "params": {**best["params"], "iterations": best["iterations"]},
+            "cv_rmse": best["rmse"],
+            "folds": folds,
+            "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "trials": results,
+        }, f, indent=2)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tune CatBoost hyperparameters with K-fold random search.")
+    parser.add_argument("component", choices=["cpu", "gpu"])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=1, help="Trials to run in parallel processes")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1,
+                        help="Total CatBoost threads shared by the parallel trials")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    label = args.component.upper()
+    df = storage.load_frame(project_root, f"{args.component}_clean")
+
+    start = time.perf_counter()
+    best, results = tune(df, label, args.trials, args.folds, args.jobs, args.cores, args.seed)
+    pruned = sum(r["status"] == "pruned" for r in results)
+    print(f"[Tune {label}] {len(results)} trials ({pruned} pruned) in {time.perf_counter() - start:.1f}s")
+    if best is None:
+        raise SystemExit("No trial completed")
+
+    model_path = os.path.join(project_root, "model", f"{args.component}_price_model_catboost.cbm")
+    path = save_best_params(model_path, best, results, args.folds)
+    print(f"[Tune {label}] best RMSE ${best['rmse']:.2f} with {best['params']}")
+    print(f"Saved best parameters to {path}; the next pipeline run retrains train_{args.component} with them")
@@ -0,0 +1,170 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import fetch
+from fetch import Fetcher, HostRateLimiter
+
+PAGE = "<table id=\"cputable\"><tr><td>Ryzen</td></tr></table>"
+LAST_MODIFIED = "Wed, 01 Oct 2025 00:00:00 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /page:        200 with ETag "v1" and Last-Modified, 304 when either validator matches
+    /flaky?n=&retry_after=: 503 for the first n requests, then 200
+    /missing:     404
+    /slow?ms=:    200 after a delay, body is the path
+    """
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body="", headers=None):
+        data = body.encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append((url.path, dict(self.headers), time.monotonic()))
+            server.counts[self.path] = count = server.counts.get(self.path, 0) + 1
+
+        if url.path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"' or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self.send(304)
+            return self.send(200, PAGE, {"ETag": '"v1"', "Last-Modified": LAST_MODIFIED})
+        if url.path == "/modified-since":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self.send(304)
+            return self.send(200, PAGE, {"Last-Modified": LAST_MODIFIED})
+        if url.path == "/flaky":
+            if count <= int(query.get("n", 1)):
+                headers = {"Retry-After": query["retry_after"]} if "retry_after" in query else {}
+                return self.send(503, "busy", headers)
+            return self.send(200, "recovered")
+        if url.path == "/slow":
+            time.sleep(int(query["ms"]) / 1000)
+            return self.send(200, self.path)
+        self.send(404, "not found")
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.counts = {}
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Records retry delays instead of sleeping. The rate limiter is disabled
+    (min_interval=0) in the tests that use this, so it never sleeps.
+    """
+    delays = []
+    monkeypatch.setattr(fetch.time, "sleep", delays.append)
+    return delays
+
+
+def make_fetcher(**kwargs):
+    options = {"min_interval": 0, "jitter": 0, "backoff": 0.5, "retries": 3, "timeout": 5}
+    options.update(kwargs)
+    return Fetcher(**options)
+
+
+def test_etag_revalidation_serves_cached_body(server, tmp_path):
+    fetcher = make_fetcher(cache_dir=str(tmp_path))
+    first = fetcher.fetch(server.url + "/page")
+    assert (first.status, first.text, first.not_modified) == (200, PAGE, False)
+
+    # A new Fetcher over the same cache directory reads the stored validators from disk
+    second = make_fetcher(cache_dir=str(tmp_path)).fetch(server.url + "/page")
+    assert (second.status, second.text, second.not_modified) == (304, PAGE, True)
+    headers = server.requests[-1][1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_if_modified_since_without_etag(server, tmp_path):
+    fetcher = make_fetcher(cache_dir=str(tmp_path))
+    fetcher.fetch(server.url + "/modified-since")
+    result = fetcher.fetch(server.url + "/modified-since")
+    assert result.not_modified and result.text == PAGE
+    assert "If-None-Match" not in server.requests[-1][1]
+
+
+def test_no_validators_sent_without_cache(server):
+    fetcher = make_fetcher()
+    fetcher.fetch(server.url + "/page")
+    result = fetcher.fetch(server.url + "/page")
+    assert (result.status, result.not_modified) == (200, False)
+    assert "If-None-Match" not in server.requests[-1][1]
+
+
+def test_retries_5xx_with_exponential_backoff(server, sleeps):
+    result = make_fetcher().fetch(server.url + "/flaky?n=2")
+    assert (result.status, result.text) == (200, "recovered")
+    assert server.counts["/flaky?n=2"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retry_after_overrides_backoff(server, sleeps):
+    result = make_fetcher().fetch(server.url + "/flaky?n=1&retry_after=7")
+    assert result.text == "recovered"
+    assert sleeps == [7.0]
+
+
+def test_gives_up_after_all_attempts(server, sleeps):
+    assert make_fetcher(retries=2).fetch(server.url + "/flaky?n=10") is None
+    assert server.counts["/flaky?n=10"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_client_errors_are_not_retried(server, sleeps):
+    assert make_fetcher().fetch(server.url + "/missing") is None
+    assert server.counts["/missing"] == 1
+    assert sleeps == []
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(min_interval=0.1, jitter=0)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait("a.example")
+    assert time.monotonic() - start >= 0.2
+    # Another host has its own schedule and does not wait
+    other = time.monotonic()
+    limiter.wait("b.example")
+    assert time.monotonic() - other < 0.05
+
+
+def test_fetcher_spacing_between_requests_to_one_host(server):
+    fetcher = make_fetcher(min_interval=0.1, max_workers=4)
+    fetcher.fetch_all([server.url + "/page"] * 4)
+    times = sorted(arrived for _, _, arrived in server.requests)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.09
+
+
+def test_fetch_all_keeps_input_order(server):
+    urls = [server.url + f"/slow?ms={ms}" for ms in (300, 10, 150, 0)]
+    results = make_fetcher(max_workers=4).fetch_all(urls)
+    assert [r.url for r in results] == urls
+    assert [r.text for r in results] == [url[len(server.url):] for url in urls]
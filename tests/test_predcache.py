@@ -0,0 +1,166 @@
+import sys
+import threading
+
+import pytest
+
+import predict
+from predcache import CacheBackend, LRUBackend, PredictionCache, canonical_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DictBackend(CacheBackend):
+    """
+    Stand-in for a shared cache: a plain dict with no eviction policy.
+    """
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+    def clear(self):
+        self.entries.clear()
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """
+    Replaces the model call with a stub that records each scored row;
+    the price is the first feature plus a per-model offset.
+    """
+    calls = []
+
+    def score_one(model, values, brand):
+        calls.append((model, tuple(values), brand))
+        return values[0] + model
+    monkeypatch.setattr(predict, "score_one", score_one)
+    return calls
+
+
+def payload(score=20588, brand="AMD"):
+    return {"PassMark_Score": score, "ValueScore": 45.1, "Rank": 120, "Brand": brand}
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LRUBackend(max_size=2, ttl=None)
+    backend.set("a", 1.0)
+    backend.set("b", 2.0)
+    assert backend.get("a") == 1.0  # "b" is now the least recently used
+    backend.set("c", 3.0)
+    assert backend.get("b") is None
+    assert backend.get("a") == 1.0
+    assert backend.get("c") == 3.0
+    assert len(backend) == 2
+    assert backend.stats()["evictions"] == 1
+
+
+def test_lru_set_refreshes_existing_key():
+    backend = LRUBackend(max_size=2, ttl=None)
+    backend.set("a", 1.0)
+    backend.set("b", 2.0)
+    backend.set("a", 1.5)
+    backend.set("c", 3.0)
+    assert backend.get("a") == 1.5
+    assert backend.get("b") is None
+
+
+def test_lru_ttl_expiry():
+    clock = FakeClock()
+    backend = LRUBackend(max_size=10, ttl=5.0, clock=clock)
+    backend.set("a", 1.0)
+    clock.now = 4.9
+    assert backend.get("a") == 1.0
+    clock.now = 5.0
+    assert backend.get("a") is None
+    assert len(backend) == 0
+    assert backend.stats()["expirations"] == 1
+    assert backend.stats()["evictions"] == 0
+
+
+def test_lru_disabled_when_size_is_zero():
+    backend = LRUBackend(max_size=0, ttl=None)
+    backend.set("a", 1.0)
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+
+def test_hit_miss_and_eviction_counters(scored):
+    cache = PredictionCache("CPU", backend=LRUBackend(max_size=1, ttl=None))
+    assert cache.predict(0, "v1", payload(100)) == 100
+    assert cache.predict(0, "v1", payload(100)) == 100
+    assert cache.predict(0, "v1", payload(200)) == 200
+    assert cache.predict(0, "v1", payload(100)) == 100
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 2)
+    assert stats["hit_rate"] == 0.25
+    assert stats["size"] == 1
+    assert len(scored) == 3
+
+
+def test_canonical_key_equates_numeric_spellings():
+    keys = {canonical_key(predict.validate_record(payload(score))[0], "AMD") for score in (20588, 20588.0, "20588")}
+    assert len(keys) == 1
+    assert canonical_key([20588.0, 45.1, 120.0], "AMD") != canonical_key([20589.0, 45.1, 120.0], "AMD")
+    assert canonical_key([20588.0, 45.1, 120.0], "AMD") != canonical_key([20588.0, 45.1, 120.0], "Intel")
+
+
+def test_numeric_spellings_share_one_entry(scored):
+    cache = PredictionCache("CPU", backend=LRUBackend(ttl=None))
+    prices = [cache.predict(0, "v1", payload(score)) for score in (20588, 20588.0, "20588")]
+    assert prices == [20588, 20588, 20588]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_invalid_payload_is_not_cached(scored):
+    cache = PredictionCache("CPU", backend=LRUBackend(ttl=None))
+    with pytest.raises(predict.ValidationError):
+        cache.predict(0, "v1", {"PassMark_Score": "fast"})
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_new_model_version_misses_through_shared_backend(scored):
+    backend = DictBackend()
+    cache = PredictionCache("CPU", backend=backend)
+    assert cache.predict(0, "v1", payload()) == 20588
+    assert cache.predict(1000, "v2", payload()) == 21588
+    assert cache.predict(0, "v1", payload()) == 20588
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert sorted(key.split(":")[1] for key in backend.entries) == ["v1", "v2"]
+    assert all(key.startswith("CPU:") for key in backend.entries)
+
+
+def test_price_is_stored_under_the_version_that_scored(scored):
+    backend = DictBackend()
+    cache = PredictionCache("CPU", backend=backend)
+    values, brand = predict.validate_record(payload())
+    cache.score(0, "old", values, brand)
+    assert backend.get(cache.key("new", values, brand)) is None
+    assert backend.get(cache.key("old", values, brand)) == 20588
+
+
+def test_counters_are_exact_under_concurrent_requests(scored):
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible to expose races
+    cache = PredictionCache("CPU", backend=LRUBackend(ttl=None))
+    threads = [threading.Thread(target=lambda: [cache.predict(0, "v1", payload(i % 10)) for i in range(2000)])
+               for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+    assert stats["misses"] == len(scored)